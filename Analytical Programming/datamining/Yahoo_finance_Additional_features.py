@@ -1,8 +1,58 @@
+import os
+import time
+
 import streamlit as st
-import yfinance as yf
 import matplotlib.pyplot as plt
 import pandas as pd
-from io import BytesIO
+
+from backtest import COST_BPS, STRATEGIES, equity_curves, parse_params, run_grid
+from charts import BACKENDS, METHODS, line_figure, webgl_available, webgl_figure
+from export import FORMATS, new_bundle
+from indicators import INDICATORS, PRICE_INDICATORS, compute
+from price_store import COLUMNS, LIVE_PRICE_TTL, default_store
+from universe import (CORRELATION_WINDOW, correlation_matrix, indicator_snapshot, long_frame, parse_symbols,
+                      period_returns, read_universe, returns_matrix, rolling_correlation, top_movers, wide_frame)
+
+
+# Served from the local price store, which only downloads dates it does not hold yet (see price_store.py);
+# the memory tier keeps today's still-moving bar from being refetched on every click
+@st.cache_data(ttl=LIVE_PRICE_TTL, show_spinner=False)
+def load_prices(symbol, start, end):
+    return default_store().get(symbol, start, end)
+
+
+# Computed once per (universe, range, window) and shared read-only by every rerun and session,
+# so the cross-sectional views are not rebuilt (or copied) when a widget changes
+@st.cache_resource(ttl=LIVE_PRICE_TTL, show_spinner="Loading prices...")
+def universe_views(symbols, start, end, window):
+    frames = default_store().get_many(symbols, start, end)
+    close = wide_frame(frames)
+    returns = returns_matrix(close)
+    return {
+        "long": long_frame(frames),
+        "close": close,
+        "returns": returns,
+        "period_returns": period_returns(close),
+        "correlation": correlation_matrix(returns, window),
+        "rolling_correlation": rolling_correlation(returns, window),
+        "indicators": indicator_snapshot(frames),
+        "missing": [symbol for symbol in symbols if frames[symbol].empty],
+    }
+
+
+# Closes of a backtest universe, loaded once and shared like universe_views()
+@st.cache_resource(ttl=LIVE_PRICE_TTL, show_spinner="Loading prices...")
+def universe_closes(symbols, start, end):
+    return wide_frame(default_store().get_many(symbols, start, end))
+
+
+# Long histories are decimated to the chart's width before drawing (see charts.py)
+def show_chart(panels, title, backend, method):
+    if backend == BACKENDS[1] and webgl_available():
+        st.plotly_chart(webgl_figure(panels, title, method))
+    else:
+        st.pyplot(line_figure(panels, title, method))
+
 
 # Dictionary of stock symbols
 STOCKS = {
@@ -14,48 +64,205 @@ STOCKS = {
 # Streamlit UI
 st.title("Stock Time Series Visualization")
 
-# Select a stock
-selected_stock = st.selectbox("Choose a stock:", list(STOCKS.keys()))
+mode = st.radio("Mode", ["Single stock", "Universe (ticker list or CSV)", "Backtest"], horizontal=True)
+col1, col2 = st.columns(2)
+backend = col1.radio("Chart", BACKENDS, horizontal=True)
+method = col2.selectbox("Downsampling", METHODS)
+if backend == BACKENDS[1] and not webgl_available():
+    st.warning("Interactive charts need plotly (pip install plotly); showing static charts.")
+
+if mode == "Single stock":
+    # Select a stock
+    selected_stock = st.selectbox("Choose a stock:", list(STOCKS.keys()))
+
+    # Select date range
+    start_date = st.date_input("Start Date")
+    end_date = st.date_input("End Date")
+    indicator_names = st.multiselect("Indicators", list(INDICATORS))
+    export_format = FORMATS[st.selectbox("Export format", list(FORMATS))]
 
-# Select date range
-start_date = st.date_input("Start Date")
-end_date = st.date_input("End Date")
+    # Fetch data button
+    if st.button("Fetch Data"):
+        if start_date and end_date:
+            stock_symbol = STOCKS[selected_stock]
 
-# Fetch data button
-if st.button("Fetch Data"):
-    if start_date and end_date:
-        stock_symbol = STOCKS[selected_stock]
+            # Download stock data
+            df = load_prices(stock_symbol, start_date, end_date)
+
+            if df.empty:
+                st.warning("No data available for the selected date range. Try another period.")
+            else:
+                # Indicators over the loaded bars; price-scale ones share the price axis, the rest get a panel each
+                bars = {column: df[column].to_numpy() for column in COLUMNS}
+                values = {name: compute(bars, [name]) for name in indicator_names}
+                prices = [("Opening Price", df["Open"], "orange"), ("Closing Price", df["Close"], "blue"),
+                          ("High Price", df["High"], "green"), ("Low Price", df["Low"], "red")]
+                panels = [("Price (USD)", prices)]
+                for name in indicator_names:
+                    lines = [(label, pd.Series(series[0], index=df.index), None)
+                             for label, series in values[name].items()]
+                    if name in PRICE_INDICATORS:
+                        prices.extend(lines)
+                    else:
+                        panels.append((name, lines))
+
+                # Plot the time series data
+                show_chart(panels, f"{selected_stock} Stock Prices", backend, method)
+
+                # Export data (written to disk in chunks, read only when clicked)
+                bundle = new_bundle(st.session_state, f"{stock_symbol}_stock_data", export_format, index=True)
+                bundle.add(f"{stock_symbol}_stock_data", df.assign(**{
+                    label: series[0] for name in indicator_names for label, series in values[name].items()}))
+                bundle.download_button()
+        else:
+            st.warning("Please select a valid start and end date.")
 
-        # Download stock data
-        df = yf.download(stock_symbol, start=start_date, end=end_date)
+elif mode == "Universe (ticker list or CSV)":
+    # Tickers from a list or a universe CSV, downloaded in concurrent batches into the local price store
+    tickers = st.text_area("Tickers (separated by commas or spaces):", value=" ".join(STOCKS.values()))
+    universe_file = st.file_uploader("...or a universe CSV (Symbol column)", type=["csv"])
+    start_date = st.date_input("Start Date", key="universe_start")
+    end_date = st.date_input("End Date", key="universe_end")
+    window = st.number_input("Correlation window (trading days)", min_value=5, value=CORRELATION_WINDOW)
+    export_format = FORMATS[st.selectbox("Export format", list(FORMATS), key="universe_format")]
 
-        if df.empty:
+    if st.button("Load Universe"):
+        symbols = read_universe(universe_file) if universe_file is not None else parse_symbols(tickers)
+        if not symbols:
+            st.warning("Please enter at least one ticker or upload a universe CSV.")
+        else:
+            st.session_state.universe = (tuple(symbols), start_date, end_date, int(window))
+            views = universe_views(*st.session_state.universe)
+            # Export written once per load: prices in long format and aligned closes
+            bundle = new_bundle(st.session_state, "universe_prices", export_format)
+            bundle.add("prices_long", views["long"])
+            bundle.add("close_wide", views["close"].reset_index())
+
+    if "universe" in st.session_state:
+        views = universe_views(*st.session_state.universe)
+        close = views["close"]
+        if views["missing"]:
+            st.warning(f"No data for {len(views['missing'])} symbols: {', '.join(views['missing'][:50])}")
+        if close.empty:
             st.warning("No data available for the selected date range. Try another period.")
         else:
-            # Plot the time series data
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.plot(df.index, df["Open"], label="Opening Price", linewidth=1, color="orange")
-            ax.plot(df.index, df["Close"], label="Closing Price", linewidth=1, color="blue")
-            ax.plot(df.index, df["High"], label="High Price", linewidth=1, color="green")
-            ax.plot(df.index, df["Low"], label="Low Price", linewidth=1, color="red")
-            ax.set_title(f"{selected_stock} Stock Prices")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Price (USD)")
-            ax.legend()
-            ax.grid()
-            
-            # Display plot
+            st.write(f"{close.shape[1]} symbols x {close.shape[0]} trading days")
+
+            st.write("### Top Movers")
+            col1, col2 = st.columns(2)
+            period = col1.selectbox("Period", list(views["period_returns"].columns))
+            count = col2.number_input("Symbols", min_value=1, max_value=100, value=10)
+            gainers, losers = top_movers(views["period_returns"][period], count)
+            col1.write("Gainers")
+            col1.dataframe(gainers.style.format("{:+.2%}"))
+            col2.write("Losers")
+            col2.dataframe(losers.style.format("{:+.2%}"))
+            with st.expander("Returns of every symbol"):
+                st.dataframe(views["period_returns"].style.format("{:+.2%}"))
+
+            st.write(f"### Correlation of the Last {st.session_state.universe[3]} Trading Days")
+            correlation = views["correlation"]
+            fig, ax = plt.subplots(figsize=(8, 7))
+            image = ax.imshow(correlation.to_numpy(), cmap="RdBu_r", vmin=-1, vmax=1)
+            if len(correlation) <= 40:
+                ax.set_xticks(range(len(correlation)), correlation.columns, rotation=90)
+                ax.set_yticks(range(len(correlation)), correlation.index)
+            fig.colorbar(image, ax=ax)
             st.pyplot(fig)
-            
-            # Export data as CSV
-            csv_buffer = BytesIO()
-            df.to_csv(csv_buffer, index=True)
-            csv_buffer.seek(0)
-            st.download_button(
-                label="Download Data as CSV",
-                data=csv_buffer,
-                file_name=f"{stock_symbol}_stock_data.csv",
-                mime="text/csv"
-            )
-    else:
-        st.warning("Please select a valid start and end date.")
+
+            st.write("### Rolling Correlation with the Universe Average")
+            chosen = st.multiselect("Symbols", list(close.columns), default=list(close.columns[:5]))
+            if chosen:
+                rolling = views["rolling_correlation"]
+                show_chart([("Correlation", [(symbol, rolling[symbol], None) for symbol in chosen])], None,
+                           backend, method)
+
+            st.write("### Indicators (Latest Bar)")
+            st.dataframe(views["indicators"].style.format({
+                "RSI": "{:.1f}", "MACD Histogram": "{:+.3f}", "ATR": "{:.2f}",
+                "Volatility": "{:.1%}", "Drawdown": "{:.1%}", "Max Drawdown": "{:.1%}"}))
+
+            st.write("### Daily Returns")
+            st.dataframe(views["returns"].iloc[-60:].style.format("{:+.2%}"))
+
+            bundle = st.session_state.get("export")
+            if bundle is not None and bundle.name == "universe_prices":
+                bundle.download_button()
+
+else:
+    # A strategy over a parameter grid, on prices from the local price store (see backtest.py)
+    tickers = st.text_area("Tickers (separated by commas or spaces):", value=" ".join(STOCKS.values()),
+                           key="backtest_tickers")
+    universe_file = st.file_uploader("...or a universe CSV (Symbol column)", type=["csv"], key="backtest_file")
+    start_date = st.date_input("Start Date", key="backtest_start")
+    end_date = st.date_input("End Date", key="backtest_end")
+    strategy = st.selectbox("Strategy", list(STRATEGIES))
+    grid_text = {name: st.text_input(f"{name} values (comma-separated)", ", ".join(map(str, values)),
+                                     key=f"grid_{strategy}_{name}")
+                 for name, values in STRATEGIES[strategy][1].items()}
+    col1, col2 = st.columns(2)
+    cost_bps = col1.number_input("Transaction cost (bps)", min_value=0.0, value=COST_BPS)
+    workers = col2.number_input("Worker processes", min_value=1, value=os.cpu_count() or 1)
+    export_format = FORMATS[st.selectbox("Export format", list(FORMATS), key="backtest_format")]
+
+    if st.button("Run Backtest"):
+        symbols = read_universe(universe_file) if universe_file is not None else parse_symbols(tickers)
+        try:
+            grid, error = parse_params([f"{name}={text}" for name, text in grid_text.items()]), None
+        except ValueError as e:
+            grid, error = None, str(e)
+        if not symbols:
+            st.warning("Please enter at least one ticker or upload a universe CSV.")
+        elif error:
+            st.warning(f"Invalid parameter values: {error}")
+        elif not all(grid.values()):
+            st.warning("Every parameter needs at least one numeric value.")
+        else:
+            close = universe_closes(tuple(symbols), start_date, end_date)
+            if close.empty:
+                st.session_state.pop("backtest", None)
+                st.warning("No data available for the selected date range. Try another period.")
+            else:
+                started = time.perf_counter()
+                with st.spinner("Backtesting..."):
+                    summary, by_symbol = run_grid(close, strategy, grid, cost_bps, int(workers))
+                st.session_state.backtest = {
+                    "close": close, "strategy": strategy, "cost_bps": cost_bps, "summary": summary,
+                    "by_symbol": by_symbol, "seconds": time.perf_counter() - started}
+                # Export written once per run: the grid table and every symbol at every grid point
+                bundle = new_bundle(st.session_state, "backtest", export_format)
+                bundle.add("grid", summary)
+                bundle.add("by_symbol", by_symbol)
+
+    if "backtest" in st.session_state:
+        result = st.session_state.backtest
+        summary, close = result["summary"], result["close"]
+        names = list(STRATEGIES[result["strategy"]][1])
+        percent = {"Total Return": "{:+.1%}", "CAGR": "{:+.1%}", "Volatility": "{:.1%}", "Sharpe": "{:.2f}",
+                   "Max Drawdown": "{:.1%}", "Turnover": "{:.1f}", "Exposure": "{:.0%}"}
+        st.write(f"{result['strategy']}: {close.shape[1]} symbols x {close.shape[0]} days, "
+                 f"{len(summary)} grid points in {result['seconds']:.1f} s")
+
+        st.write("### Grid Results (Equal-Weight Portfolio)")
+        st.dataframe(summary.style.format(percent), hide_index=True)
+
+        # Whole numbers back to int: a column mixing 20 and 30.5 comes back as floats, and windows must be ints
+        points = [{name: int(value) if float(value).is_integer() else value for name, value in point.items()}
+                  for point in summary[names].to_dict("records")]
+        labels = [", ".join(f"{name}={value}" for name, value in point.items()) for point in points]
+        chosen = st.selectbox("Grid point", range(len(points)), format_func=labels.__getitem__)
+        params = points[chosen]
+        curves = equity_curves(close, result["strategy"], params, result["cost_bps"])
+        drawdown = curves["Portfolio"] / curves["Portfolio"].cummax() - 1
+        show_chart([("Growth of 1", [("Portfolio", curves["Portfolio"], "black")]),
+                    ("Drawdown", [("Portfolio", drawdown, "red")])], labels[chosen], backend, method)
+
+        st.write("### Per-Symbol Results")
+        by_symbol = result["by_symbol"]
+        selected = (by_symbol[names] == pd.Series(params)).all(axis=1).to_numpy()
+        st.dataframe(by_symbol[selected].drop(columns=names).sort_values("Sharpe", ascending=False)
+                     .style.format(percent), hide_index=True)
+
+        bundle = st.session_state.get("export")
+        if bundle is not None and bundle.name == "backtest":
+            bundle.download_button("Download Results")
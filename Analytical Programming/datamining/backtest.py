@@ -0,0 +1,255 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from indicators import TRADING_DAYS, ffill, rsi, sma
+
+# --- Constants ---
+COST_BPS = 5.0  # transaction cost per unit of turnover, in basis points of the traded value
+CHUNK_POINTS = 8  # grid points evaluated together, as one symbol x time block each, per worker task
+METRICS = ["Total Return", "CAGR", "Volatility", "Sharpe", "Max Drawdown", "Turnover", "Exposure", "Trades"]
+WINDOW_PARAMS = {"fast", "slow", "period", "lookback"}  # counted in bars, so whole numbers of at least 1
+
+
+# --- Strategies ---
+# A strategy maps closes (symbol x time) and its parameters to the position held
+# from each close to the next: 1 long, 0 flat. Warm-up bars without a signal are flat.
+# `cache` is a dict owned by the caller evaluating grid points on these closes.
+# Grid points share their windows (fast=10 and fast=20 both meet slow=150, RSI
+# points often differ only in thresholds), so what one point computes from the
+# closes is kept there for the next.
+def moving_average(close, window, cache):
+    """sma() of `close`, computed once per window for as long as `cache` lives."""
+    key = ("sma", window)
+    if key not in cache:
+        cache[key] = sma({"Close": close}, window=window)[0]
+    return cache[key]
+
+
+def relative_strength(close, period, cache):
+    """rsi() of `close`, computed once per period for as long as `cache` lives."""
+    key = ("rsi", period)
+    if key not in cache:
+        cache[key] = rsi({"Close": close}, period=period)[0]
+    return cache[key]
+
+
+def sma_crossover(close, cache, fast, slow):
+    """Long while the `fast`-day moving average is above the `slow`-day one."""
+    with np.errstate(invalid="ignore"):
+        return (moving_average(close, fast, cache) > moving_average(close, slow, cache)).astype("float64")
+
+
+def rsi_reversion(close, cache, period, lower, upper):
+    """Long from when RSI drops below `lower` until it rises above `upper`."""
+    values = relative_strength(close, period, cache)
+    with np.errstate(invalid="ignore"):
+        signal = np.where(values < lower, 1.0, np.where(values > upper, 0.0, np.nan))
+    return np.nan_to_num(ffill(signal))
+
+
+def momentum(close, cache, lookback):
+    """Long while the `lookback`-day return is positive."""
+    position = np.zeros(close.shape)
+    with np.errstate(invalid="ignore"):
+        position[:, lookback:] = close[:, lookback:] > close[:, :-lookback]
+    return position
+
+
+# Name -> (function, default parameter grid)
+STRATEGIES = {
+    "SMA crossover": (sma_crossover, {"fast": [10, 20, 50], "slow": [100, 150, 200]}),
+    "RSI reversion": (rsi_reversion, {"period": [14], "lower": [20, 30], "upper": [60, 70]}),
+    "Momentum": (momentum, {"lookback": [21, 63, 126, 252]}),
+}
+
+
+def parameter_grid(params):
+    """Every combination of {name: [values]}, as a list of {name: value}."""
+    return [dict(zip(params, values)) for values in itertools.product(*params.values())]
+
+
+# --- Simulation ---
+def simulate(close, positions, cost_bps=COST_BPS):
+    """Daily strategy returns for positions shaped (..., symbol, time), NaN before a symbol's first bar.
+
+    The position taken at a close earns the next bar's return; every change
+    of position pays `cost_bps` of the traded value on the day it is made.
+    """
+    returns = np.full(close.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[:, 1:] = close[:, 1:] / close[:, :-1] - 1
+    held = np.concatenate([np.zeros(positions.shape[:-1] + (1,)), positions[..., :-1]], axis=-1)
+    costs = np.abs(np.diff(positions, axis=-1, prepend=0)) * cost_bps / 10_000
+    return np.where(np.isnan(returns), np.nan, held * np.nan_to_num(returns) - costs)
+
+
+def portfolio(pnl, positions):
+    """Equal-weight portfolio over symbols: the mean return and position of the symbols trading each day."""
+    active = ~np.isnan(pnl)
+    count = active.sum(axis=-2)
+    weights = np.divide(active, count[..., None, :], out=np.zeros(active.shape), where=count[..., None, :] > 0)
+    returns = np.where(count > 0, (np.nan_to_num(pnl) * weights).sum(axis=-2), np.nan)
+    return returns, (positions * weights).sum(axis=-2)
+
+
+def performance(pnl, positions):
+    """METRICS over the last axis of daily returns (NaN = not trading) and the positions behind them.
+
+    Sharpe assumes a zero risk-free rate; volatility, CAGR and turnover are
+    annualized over the trading days only. Turnover is the traded value per
+    year in multiples of the capital.
+    """
+    active = ~np.isnan(pnl)
+    days = active.sum(axis=-1)
+    filled = np.nan_to_num(pnl)
+    equity = np.cumprod(1 + filled, axis=-1)
+    changes = np.abs(np.diff(positions, axis=-1, prepend=0))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = filled.sum(axis=-1) / days
+        variance = ((filled - mean[..., None]) ** 2 * active).sum(axis=-1) / (days - 1)
+        volatility = np.sqrt(variance * TRADING_DAYS)
+        return {
+            "Total Return": equity[..., -1] - 1,
+            "CAGR": equity[..., -1] ** (TRADING_DAYS / days) - 1,
+            "Volatility": volatility,
+            "Sharpe": np.where(volatility > 0, mean * TRADING_DAYS / volatility, np.nan),
+            "Max Drawdown": (equity / np.maximum.accumulate(equity, axis=-1) - 1).min(axis=-1),
+            "Turnover": changes.sum(axis=-1) / days * TRADING_DAYS,
+            "Exposure": ((positions != 0) & active).sum(axis=-1) / days,
+            "Trades": (changes > 0).sum(axis=-1),
+        }
+
+
+def evaluate(close, strategy, points, cost_bps=COST_BPS, cache=None):
+    """Portfolio metrics (one value per grid point) and per-symbol metrics (grid point x symbol).
+
+    Positions of all `points` are stacked into one grid point x symbol x
+    time array, so costs, P&L and metrics are computed for the whole block
+    at once. Pass the same `cache` dict to every call on the same closes to
+    share the strategy's intermediate results between chunks.
+    """
+    function, _ = STRATEGIES[strategy]
+    cache = {} if cache is None else cache
+    positions = np.stack([function(close, cache, **params) for params in points])
+    pnl = simulate(close, positions, cost_bps)
+    return performance(*portfolio(pnl, positions)), performance(pnl, positions)
+
+
+# Worker processes receive the closes once, when they start, rather than with every task,
+# and keep one cache for them: a worker process only ever evaluates these closes
+_close = None
+_cache = None
+
+
+def _init_worker(close):
+    global _close, _cache
+    _close, _cache = close, {}
+
+
+def _evaluate_chunk(strategy, points, cost_bps):
+    return evaluate(_close, strategy, points, cost_bps, _cache)
+
+
+def run_grid(close, strategy, grid=None, cost_bps=COST_BPS, max_workers=None):
+    """Backtest `strategy` on every point of `grid` (default: the strategy's own) over a date x symbol close frame.
+
+    Grid points are evaluated in chunks on a pool of worker processes, each
+    holding its own copy of the closes. Returns (summary, by_symbol): the
+    equal-weight portfolio metrics per grid point, best Sharpe first, and
+    the metrics of every symbol at every grid point.
+    """
+    points = parameter_grid(grid or STRATEGIES[strategy][1])
+    values = np.ascontiguousarray(close.to_numpy(dtype="float64").T)
+    chunks = [points[i:i + CHUNK_POINTS] for i in range(0, len(points), CHUNK_POINTS)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(values,)) as pool:
+            results = list(pool.map(_evaluate_chunk, [strategy] * len(chunks), chunks, [cost_bps] * len(chunks)))
+    else:
+        cache = {}
+        results = [evaluate(values, strategy, chunk, cost_bps, cache) for chunk in chunks]
+
+    params = pd.DataFrame(points)
+    summary = pd.concat([params, pd.DataFrame({
+        metric: np.concatenate([result[0][metric] for result in results]) for metric in METRICS})], axis=1)
+    by_symbol = pd.concat([params.loc[params.index.repeat(close.shape[1])].reset_index(drop=True),
+                           pd.DataFrame({"Symbol": np.tile(close.columns.to_numpy(), len(points)), **{
+                               metric: np.concatenate([result[1][metric].ravel() for result in results])
+                               for metric in METRICS}})], axis=1)
+    return summary.sort_values("Sharpe", ascending=False, na_position="last"), by_symbol
+
+
+def equity_curves(close, strategy, params, cost_bps=COST_BPS):
+    """Growth of 1 invested in `strategy` with `params`: one column per symbol plus the Portfolio, date x column."""
+    function, _ = STRATEGIES[strategy]
+    values = close.to_numpy(dtype="float64").T
+    positions = function(values, {}, **params)
+    pnl = simulate(values, positions, cost_bps)
+    returns, _ = portfolio(pnl, positions)
+    curves = np.cumprod(1 + np.nan_to_num(np.vstack([returns, pnl])), axis=1)
+    return pd.DataFrame(curves.T, index=close.index, columns=["Portfolio", *close.columns])
+
+
+def parse_params(values):
+    """{"fast": [10, 20]} from ["fast=10,20"].
+
+    Whole numbers become ints ("10.0" is 10); a window parameter (WINDOW_PARAMS)
+    that is not a whole number of at least 1 raises ValueError.
+    """
+    params = {}
+    for value in values:
+        name, _, numbers = value.partition("=")
+        name = name.strip()
+        params[name] = []
+        for n in filter(str.strip, numbers.split(",")):
+            number = float(n)
+            if number.is_integer():
+                number = int(number)
+            if name in WINDOW_PARAMS and (not isinstance(number, int) or number < 1):
+                raise ValueError(f"{name} must be a whole number of bars of at least 1, not {n.strip()}")
+            params[name].append(number)
+    return params
+
+
+def main():
+    from price_store import default_store
+    from universe import parse_symbols, read_universe, wide_frame
+
+    parser = argparse.ArgumentParser(description="Backtest a strategy over a parameter grid on stored prices.")
+    parser.add_argument("--symbols", nargs="*", default=[], help="tickers to trade")
+    parser.add_argument("--universe", default=None, help="universe CSV with a Symbol column")
+    parser.add_argument("--start", required=True)
+    parser.add_argument("--end", required=True)
+    parser.add_argument("--strategy", choices=list(STRATEGIES), default="SMA crossover")
+    parser.add_argument("--param", action="append", default=[],
+                        help="grid values of one parameter, e.g. fast=10,20,50 (default: the strategy's grid)")
+    parser.add_argument("--cost-bps", type=float, default=COST_BPS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the per-symbol results to this CSV file")
+    args = parser.parse_args()
+
+    defaults = STRATEGIES[args.strategy][1]
+    try:
+        params = parse_params(args.param)
+    except ValueError as e:
+        parser.error(str(e))
+    unknown = sorted(set(params) - set(defaults))
+    if unknown:
+        parser.error(f"{args.strategy} has no parameter {', '.join(unknown)} (it takes {', '.join(defaults)})")
+    grid = {**defaults, **params}
+    symbols = read_universe(args.universe) if args.universe else parse_symbols(" ".join(args.symbols))
+    close = wide_frame(default_store().get_many(symbols, args.start, args.end))
+    summary, by_symbol = run_grid(close, args.strategy, grid, args.cost_bps, args.workers)
+    print(f"{close.shape[1]} symbols x {close.shape[0]} days, {len(summary)} grid points\n")
+    print(summary.to_string(index=False))
+    if args.out:
+        by_symbol.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import functools
+
+import numpy as np
+
+# --- Constants ---
+METHODS = ["LTTB", "Min/max", "None"]  # how a series is reduced before drawing
+BACKENDS = ["Static (matplotlib)", "Interactive (WebGL)"]
+POINTS_PER_PIXEL = 1  # LTTB keeps the shape at one point per horizontal pixel; more is not visible
+WEBGL_POINTS = 2000  # points per line sent to the browser; some headroom for zooming in
+FIGURE_WIDTH = 10  # inches
+
+
+# --- Decimation ---
+def positions(index):
+    """The x values of an index as floats (nanoseconds for dates), for the triangle areas of LTTB."""
+    if hasattr(index, "asi8"):
+        return index.asi8.astype("float64")
+    return np.asarray(index, dtype="float64")
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the `threshold` points Largest-Triangle-Three-Buckets keeps out of (x, y).
+
+    The first and last points are kept; the points between are split into
+    threshold - 2 equal buckets, and each bucket keeps the point forming the
+    largest triangle with the point kept before it and the average of the
+    next bucket. The bucket averages are computed for all buckets at once;
+    only the choice, which depends on the previous one, loops over buckets.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    counts = np.diff(edges)
+    next_x = np.append(np.add.reduceat(x[:n - 1], edges[:-1])[1:] / counts[1:], x[-1])
+    next_y = np.append(np.add.reduceat(y[:n - 1], edges[:-1])[1:] / counts[1:], y[-1])
+
+    selected = np.empty(threshold, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, buckets):
+    """Positions of the lowest and highest point of each of `buckets` equal buckets, plus the ends, in order.
+
+    Keeps every spike, which LTTB may smooth over, at two points per bucket.
+    """
+    n = len(y)
+    if 2 * buckets >= n:
+        return np.arange(n)
+    starts = -(-np.arange(buckets) * n // buckets)  # bucket b holds the points with i * buckets // n == b
+    ends = np.append(starts[1:], n)
+    # One row per bucket, padded to the longest, so argmin/argmax run over all buckets at once
+    offsets = starts[:, None] + np.arange((ends - starts).max())
+    padded = offsets < ends[:, None]
+    values = y[np.minimum(offsets, n - 1)]
+    lowest = np.where(padded, values, np.inf).argmin(axis=1)
+    highest = np.where(padded, values, -np.inf).argmax(axis=1)
+    return np.unique(np.concatenate([starts + lowest, starts + highest, [0, n - 1]]))
+
+
+def decimate(series, points, method="LTTB"):
+    """`series` without its NaNs, reduced to about `points` points by `method` (see METHODS)."""
+    series = series.dropna()
+    if method == "None" or len(series) <= points:
+        return series
+    y = series.to_numpy(dtype="float64")
+    if method == "LTTB":
+        return series.iloc[lttb_indices(positions(series.index), y, points)]
+    return series.iloc[minmax_indices(y, points // 2)]
+
+
+# --- Figures ---
+# A chart is a list of panels stacked on a shared x axis, each (y label,
+# [(line label, Series, color or None), ...]); the first panel is the tall one.
+def line_figure(panels, title=None, method="LTTB"):
+    """Matplotlib figure of `panels`, every line decimated to the pixel width of its axes.
+
+    Drawing time then depends on the figure size, not on how many rows were
+    loaded, and so does the PNG sent to the browser.
+    """
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(len(panels), 1, figsize=(FIGURE_WIDTH, 3 + 2 * len(panels)), sharex=True,
+                             squeeze=False, height_ratios=[3] + [1] * (len(panels) - 1))
+    for i, (ax, (ylabel, lines)) in enumerate(zip(axes[:, 0], panels)):
+        points = int(ax.get_window_extent().width * POINTS_PER_PIXEL)
+        for label, series, color in lines:
+            shown = decimate(series, points, method)
+            ax.plot(shown.index, shown.to_numpy(), label=label, linewidth=1, color=color)
+        ax.set_ylabel(ylabel)
+        if i:
+            ax.legend(loc="upper left", fontsize="small")
+        else:
+            ax.legend()
+        ax.grid()
+    if title:
+        axes[0, 0].set_title(title)
+    axes[-1, 0].set_xlabel("Date")
+    return fig
+
+
+@functools.lru_cache(maxsize=1)
+def webgl_available():
+    """Whether plotly, needed for the interactive backend, is installed."""
+    try:
+        import plotly  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def webgl_figure(panels, title=None, method="LTTB", points=WEBGL_POINTS):
+    """Interactive plotly figure of `panels`, drawn with WebGL (Scattergl) from `points` points per line."""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(rows=len(panels), cols=1, shared_xaxes=True, vertical_spacing=0.03,
+                        row_heights=[3] + [1] * (len(panels) - 1))
+    for row, (ylabel, lines) in enumerate(panels, start=1):
+        for label, series, color in lines:
+            shown = decimate(series, points, method)
+            fig.add_trace(go.Scattergl(x=shown.index, y=shown.to_numpy(), name=label, mode="lines",
+                                       line={"width": 1, "color": color}), row=row, col=1)
+        fig.update_yaxes(title_text=ylabel, row=row, col=1)
+    fig.update_layout(title=title, height=100 * (3 + 2 * len(panels)), hovermode="x unified")
+    return fig
@@ -0,0 +1,189 @@
+import os
+import re
+import shutil
+import tempfile
+import weakref
+import zipfile
+from pathlib import Path
+
+# --- Constants ---
+CHUNK_ROWS = 50_000  # rows serialized per write, bounding the temporary copies
+FORMATS = {"CSV": "csv", "Parquet": "parquet"}
+MIME_TYPES = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet", "zip": "application/zip"}
+MAX_DOWNLOAD_BYTES = 200 * 2 ** 20  # st.download_button holds a download in memory while serving it
+EXPORT_DIR = Path(os.environ.get("BASE_EXPORT_DIR", Path.home() / "base-exports"))  # larger exports are kept here
+
+
+def safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "table"
+
+
+def chunks(df, rows=CHUNK_ROWS):
+    for start in range(0, len(df), rows):
+        yield df.iloc[start:start + rows]
+
+
+# --- Single Table ---
+class TableWriter:
+    """Appends DataFrame chunks to one CSV or Parquet file as they arrive.
+
+    The first chunk fixes the header (CSV) or schema (Parquet); later chunks
+    are cast to it, so batches whose nullable columns happened to be all
+    empty still line up. Only one chunk is ever held in serialized form.
+    """
+
+    def __init__(self, path, fmt="csv", index=False):
+        self.path = Path(path)
+        self.fmt = fmt
+        self.index = index
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, df):
+        for chunk in chunks(df):
+            if self.fmt == "parquet":
+                self._write_parquet(chunk)
+            else:
+                if self._file is None:
+                    self._file = open(self.path, "w", newline="", encoding="utf-8")
+                chunk.to_csv(self._file, header=self.rows == 0, index=self.index)
+            self.rows += len(chunk)
+
+    def write_arrow(self, table):
+        """Append a pyarrow Table or RecordBatch; Parquet output skips the pandas round-trip."""
+        import pandas as pd
+        import pyarrow as pa
+
+        if isinstance(table, pa.RecordBatch):
+            table = pa.Table.from_batches([table])
+        if self.fmt == "parquet":
+            self._write_table(table)
+            self.rows += table.num_rows
+        else:
+            self.write(table.to_pandas(types_mapper=pd.ArrowDtype))  # nullable ints stay ints in the CSV
+
+    def _write_parquet(self, chunk):
+        import pyarrow as pa
+
+        self._write_table(pa.Table.from_pandas(chunk, preserve_index=self.index))
+
+    def _write_table(self, table):
+        import pyarrow.parquet as pq
+
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        elif table.schema != self._writer.schema:
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+        if not self.path.exists():
+            self.path.touch()  # a table with no rows still gets its (empty) file
+
+
+# --- Bundle of Tables ---
+class ExportBundle:
+    """Tables streamed to disk one file per table, offered as a single download.
+
+    With one table the download is that file; with several it is a ZIP
+    with one member per table, so tables with different columns never have
+    to be concatenated. Files live in a temporary directory until cleanup(),
+    or until the bundle is garbage collected (its session ended) or the
+    process exits.
+    """
+
+    def __init__(self, name, fmt="csv", index=False):
+        self.name = safe_name(name)
+        self.fmt = fmt
+        self.index = index
+        self.directory = Path(tempfile.mkdtemp(prefix="base-export-"))
+        self.files = []
+        self.saved = None
+        self._archive = None
+        self._cleanup = weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+
+    def table(self, name):
+        """A TableWriter for a new table; close it when its last chunk is written."""
+        path = self.directory / f"{safe_name(name)}.{self.fmt}"
+        suffix = 1
+        while path in self.files:
+            suffix += 1
+            path = self.directory / f"{safe_name(name)}_{suffix}.{self.fmt}"
+        self.files.append(path)
+        self._archive = None
+        return TableWriter(path, self.fmt, self.index)
+
+    def add(self, name, df):
+        writer = self.table(name)
+        writer.write(df)
+        writer.close()
+
+    def path(self):
+        """The file to download: the only table, or a ZIP of all of them."""
+        if len(self.files) == 1:
+            return self.files[0]
+        if self._archive is None:
+            self._archive = self.directory / f"{self.name}.zip"
+            with zipfile.ZipFile(self._archive, "w", zipfile.ZIP_DEFLATED, allowZip64=True) as archive:
+                for file in self.files:
+                    archive.write(file, file.name)
+        return self._archive
+
+    @property
+    def file_name(self):
+        return f"{self.name}.{self.fmt}" if len(self.files) == 1 else f"{self.name}.zip"
+
+    @property
+    def mime(self):
+        return MIME_TYPES[self.fmt] if len(self.files) == 1 else MIME_TYPES["zip"]
+
+    @property
+    def size(self):
+        """Bytes of all table files (a ZIP of them is no larger)."""
+        return sum(file.stat().st_size for file in self.files)
+
+    def read(self):
+        """Bytes of the download; pass the method itself to st.download_button so it runs on click."""
+        return self.path().read_bytes()
+
+    def save(self, directory=EXPORT_DIR):
+        """Move the download out of the temporary directory into `directory`, once; returns its path."""
+        if self.saved is None:
+            directory = Path(directory)
+            directory.mkdir(parents=True, exist_ok=True)
+            target = directory / self.file_name
+            suffix = 1
+            while target.exists():
+                suffix += 1
+                target = directory / f"{Path(self.file_name).stem}_{suffix}{Path(self.file_name).suffix}"
+            self.saved = Path(shutil.move(self.path(), target))
+        return self.saved
+
+    def download_button(self, label="Download Data"):
+        """Offer the bundle with st.download_button, read only when clicked.
+
+        Streamlit keeps a download in memory while serving it, so an export
+        over MAX_DOWNLOAD_BYTES is saved to EXPORT_DIR instead and its path shown.
+        """
+        import streamlit as st
+
+        if self.saved is not None or self.size > MAX_DOWNLOAD_BYTES:
+            st.info(f"This export is too large to download through the browser; it was saved to {self.save()}")
+            return
+        st.download_button(label=label, data=self.read, file_name=self.file_name, mime=self.mime, on_click="ignore")
+
+    def cleanup(self):
+        self._cleanup()
+
+
+def new_bundle(state, name, fmt="csv", index=False):
+    """Start an ExportBundle kept in `state` (st.session_state), deleting the files of the previous one."""
+    if "export" in state:
+        state["export"].cleanup()
+    state["export"] = ExportBundle(name, fmt, index)
+    return state["export"]
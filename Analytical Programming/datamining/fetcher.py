@@ -0,0 +1,276 @@
+import argparse
+import asyncio
+import itertools
+import random
+import shutil
+import time
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from export import FORMATS, ExportBundle
+from http_cache import HTML_TTL, conditional_headers, decode, default_cache, page_key
+from tables import extract_tables
+
+# --- Constants ---
+USER_AGENT = "Mozilla/5.0"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+SITEMAP_NS = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+def host_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+# --- Per-Host Politeness ---
+class HostLimiter:
+    """At most `concurrency` requests in flight and `rate` request starts per second for one host."""
+
+    def __init__(self, concurrency, rate=None):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.interval = 1.0 / rate if rate else 0.0
+        self.next_start = 0.0
+        self.lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        await self.semaphore.acquire()
+        if self.interval:
+            async with self.lock:
+                delay = self.next_start - time.monotonic()
+                self.next_start = max(self.next_start, time.monotonic()) + self.interval
+            if delay > 0:
+                await asyncio.sleep(delay)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.semaphore.release()
+
+
+class BatchFetcher:
+    """Fetches many pages over one pooled aiohttp session.
+
+    Requests are spread over hosts with a HostLimiter each; 429/5xx responses
+    and connection errors are retried with exponential backoff and jitter
+    (honouring Retry-After), and every URL is checked against its host's
+    robots.txt first unless `respect_robots` is off. With a `cache`
+    (http_cache.DiskCache), fresh pages are served from disk and stale ones
+    are revalidated with ETag/Last-Modified instead of downloaded again.
+    """
+
+    def __init__(self, per_host_concurrency=4, per_host_rate=None, retries=3, backoff=0.5, timeout=30,
+                 respect_robots=True, user_agent=USER_AGENT, max_connections=100, cache=None, ttl=HTML_TTL):
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.max_connections = max_connections
+        self.cache = cache
+        self.ttl = ttl
+        self.limiters = {}
+        self.robots = {}
+
+    def _session(self):
+        # One pooled session per batch: connections are reused across pages of a host
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.per_host_concurrency)
+        return aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                     headers={"User-Agent": self.user_agent})
+
+    def _limiter(self, host):
+        if host not in self.limiters:
+            self.limiters[host] = HostLimiter(self.per_host_concurrency, self.per_host_rate)
+        return self.limiters[host]
+
+    async def _get(self, session, url, headers=None):
+        """GET with retries; returns (status, text, error, response headers) and never raises for HTTP failures."""
+        limiter = self._limiter(host_of(url))
+        for attempt in range(self.retries + 1):
+            retry_after = None
+            try:
+                async with limiter:
+                    async with session.get(url, headers=headers) as response:
+                        text = await response.text(errors="replace")
+                        if response.status not in RETRY_STATUSES or attempt == self.retries:
+                            error = None if response.status < 400 else f"HTTP {response.status}"
+                            return response.status, text, error, response.headers
+                        retry_after = response.headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    return None, None, f"{type(e).__name__}: {e}", {}
+            delay = self.backoff * 2 ** attempt * (1 + random.random())
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+            await asyncio.sleep(delay)
+
+    async def _allowed(self, session, url):
+        if not self.respect_robots:
+            return True
+        host = host_of(url)
+        if host not in self.robots:
+            # Cache the pending lookup so concurrent pages of one host share it
+            self.robots[host] = asyncio.ensure_future(self._load_robots(session, host))
+        parser = await self.robots[host]
+        return parser.can_fetch(self.user_agent, url)
+
+    async def _load_robots(self, session, host):
+        parser = RobotFileParser()
+        status, text, _, _ = await self._get(session, urljoin(host, "/robots.txt"))
+        if status is not None and status < 400:
+            parser.parse(text.splitlines())
+        elif status is not None and status < 500 and status not in (401, 403):
+            parser.parse([])  # missing robots.txt allows everything
+        else:
+            # Unreachable (5xx after retries, connection errors) or behind authorization:
+            # RFC 9309 treats the whole site as off limits
+            parser.disallow_all = True
+        return parser
+
+    async def _fetch_one(self, session, url):
+        entry = self.cache.get(page_key(url)) if self.cache is not None else None
+        if entry is not None and entry["fresh"]:
+            return {"url": url, "status": 200, "text": decode(entry), "error": None}
+        if not await self._allowed(session, url):
+            return {"url": url, "status": None, "text": None, "error": "Disallowed by robots.txt"}
+
+        status, text, error, headers = await self._get(session, url, conditional_headers(entry))
+        if status == 304 and entry is not None:
+            self.cache.refresh(page_key(url), self.ttl)
+            return {"url": url, "status": 304, "text": decode(entry), "error": None}
+        if self.cache is not None and status == 200:
+            self.cache.put(page_key(url), text.encode(), self.ttl, etag=headers.get("ETag"),
+                           last_modified=headers.get("Last-Modified"), encoding="utf-8")
+        return {"url": url, "status": status, "text": text, "error": error}
+
+    async def fetch(self, urls, progress=None):
+        """Yield one result dict (url, status, text, error) per URL, in completion order.
+
+        At most `max_connections` pages are in flight or waiting to be
+        consumed; a task is dropped as soon as its result is yielded, so a
+        slow consumer holds back new requests instead of collecting bodies.
+        `progress(done, total)` is called after each page.
+        """
+        urls = list(urls)
+        pending = iter(urls)
+        window = set()
+        done = 0
+        async with self._session() as session:
+            try:
+                while True:
+                    for url in itertools.islice(pending, self.max_connections - len(window)):
+                        window.add(asyncio.ensure_future(self._fetch_one(session, url)))
+                    if not window:
+                        break
+                    finished, window = await asyncio.wait(window, return_when=asyncio.FIRST_COMPLETED)
+                    while finished:
+                        done += 1
+                        yield finished.pop().result()
+                        if progress is not None:
+                            progress(done, len(urls))
+            finally:
+                for task in window:
+                    task.cancel()
+
+    async def sitemap_urls(self, sitemap_url):
+        """Page URLs listed in a sitemap, following nested sitemap indexes."""
+        async with self._session() as session:
+            urls, pending, seen = [], [sitemap_url], set()
+            while pending:
+                url = pending.pop()
+                if url in seen:
+                    continue
+                seen.add(url)
+                status, text, error, _ = await self._get(session, url)
+                if error or text is None:
+                    raise ValueError(f"Could not read sitemap {url}: {error}")
+                pages, children = parse_sitemap(text)
+                urls.extend(pages)
+                pending.extend(children)
+            return urls
+
+
+def parse_sitemap(xml_text):
+    """(page URLs, nested sitemap URLs) of a sitemap or sitemap index document."""
+    root = ET.fromstring(xml_text)
+    locs = [loc.text.strip() for loc in root.iter(f"{SITEMAP_NS}loc") if loc.text]
+    if root.tag == f"{SITEMAP_NS}sitemapindex":
+        return [], locs
+    return locs, []
+
+
+def fetch_pages(urls, progress=None, on_page=None, **fetcher_kwargs):
+    """Blocking wrapper around BatchFetcher.fetch for scripts and Streamlit.
+
+    Returns the list of result dicts, or, with `on_page`, hands each result
+    to it as soon as it completes and keeps none of them, so page bodies do
+    not pile up over a large batch. `on_page` runs in a worker thread, one
+    page at a time, so parsing a page does not stall the fetches in flight.
+    """
+    async def collect():
+        loop = asyncio.get_running_loop()
+        results = []
+        async for result in BatchFetcher(**fetcher_kwargs).fetch(urls, progress):
+            if on_page is None:
+                results.append(result)
+            else:
+                await loop.run_in_executor(None, on_page, result)
+        return results if on_page is None else None
+    return asyncio.run(collect())
+
+
+def read_sitemap(sitemap_url, **fetcher_kwargs):
+    return asyncio.run(BatchFetcher(**fetcher_kwargs).sitemap_urls(sitemap_url))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape the tables of many pages concurrently.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--urls", help="text file with one URL per line")
+    source.add_argument("--sitemap", help="sitemap (or sitemap index) URL")
+    parser.add_argument("--per-host", type=int, default=4, help="concurrent requests per host")
+    parser.add_argument("--rate", type=float, default=None, help="requests per second per host")
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--ignore-robots", action="store_true")
+    parser.add_argument("--no-cache", action="store_true", help="always download instead of using the disk cache")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), default="csv")
+    parser.add_argument("--out", default=None, help="output file (default scraped_data.<format>, or .zip for several tables)")
+    args = parser.parse_args()
+
+    options = dict(per_host_concurrency=args.per_host, per_host_rate=args.rate, retries=args.retries,
+                   respect_robots=not args.ignore_robots, cache=None if args.no_cache else default_cache())
+    if args.urls:
+        with open(args.urls) as f:
+            urls = [line.strip() for line in f if line.strip()]
+    else:
+        urls = read_sitemap(args.sitemap, **options)
+
+    bundle = ExportBundle("scraped_data", args.format)
+
+    def write_tables(result):
+        if result["error"]:
+            print(f"\n{result['url']}: {result['error']}")
+            return
+        page = urlsplit(result["url"])
+        for i, df in enumerate(extract_tables(result["text"])):
+            bundle.add(f"{page.netloc}{page.path}_table_{i+1}", df)
+
+    try:
+        fetch_pages(urls, progress=lambda done, total: print(f"\r{done}/{total} pages", end="", flush=True),
+                    on_page=write_tables, **options)
+        print()
+        if bundle.files:
+            out = args.out or bundle.file_name
+            shutil.copyfile(bundle.path(), out)
+            print(f"Wrote {len(bundle.files)} tables from {len(urls)} pages to {out}")
+        else:
+            print("No tables found.")
+    finally:
+        bundle.cleanup()
+
+
+if __name__ == "__main__":
+    main()
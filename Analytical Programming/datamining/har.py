@@ -0,0 +1,222 @@
+import argparse
+import datetime
+import os
+
+import ijson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from export import FORMATS, TableWriter
+
+# --- Constants ---
+BATCH_ROWS = 10_000  # entries per Arrow record batch; bounds memory whatever the file size
+PREVIEW_ROWS = 1_000  # entries kept for display while the rest streams to disk
+ENTRIES_PATH = "log.entries.item"  # ijson prefix of one HAR entry
+PHASES = ["Blocked", "DNS", "Connect", "SSL", "Send", "Wait", "Receive"]  # HAR timing phases, in order
+ENTRY_SCHEMA = pa.schema([
+    ("URL", pa.string()),
+    ("Method", pa.string()),
+    ("Status Code", pa.int32()),
+    ("Status Text", pa.string()),
+    ("Host", pa.string()),
+    ("Content Type", pa.string()),
+    ("Server IP", pa.string()),
+    ("Page", pa.string()),
+    ("Started", pa.timestamp("us", tz="UTC")),
+    ("Total (ms)", pa.float64()),
+    *[(f"{phase} (ms)", pa.float64()) for phase in PHASES],
+    ("Request Header Bytes", pa.int64()),
+    ("Request Body Bytes", pa.int64()),
+    ("Response Header Bytes", pa.int64()),
+    ("Response Body Bytes", pa.int64()),
+    ("Content Bytes", pa.int64()),
+    ("Transfer Bytes", pa.int64()),
+])
+# Headers are kept in long format, one row per header, rather than as a JSON blob per entry.
+# Entry is the entry's row number in the entries table; names are lower-cased (HTTP names are case-insensitive)
+HEADER_SCHEMA = pa.schema([
+    ("Entry", pa.int64()),
+    ("Direction", pa.dictionary(pa.int32(), pa.string())),
+    ("Name", pa.dictionary(pa.int32(), pa.string())),
+    ("Value", pa.dictionary(pa.int32(), pa.string())),
+])
+
+
+NULLABLE_INTS = {pa.int32(): pd.Int32Dtype(), pa.int64(): pd.Int64Dtype()}  # pandas dtypes that keep nulls in int columns
+
+
+def iter_entries(source):
+    """The entries of a HAR file (path or binary file object), parsed one at a time."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            yield from iter_entries(f)
+        return
+    yield from ijson.items(source, ENTRIES_PATH, use_float=True)
+
+
+def entry_row(entry):
+    """The raw fields of a HAR entry, keyed by ENTRY_SCHEMA column; typed_batch() cleans them up per batch."""
+    request = entry.get("request", {})
+    response = entry.get("response", {})
+    timings = entry.get("timings", {})
+    content = response.get("content", {})
+    return {
+        "URL": request.get("url", "N/A"),
+        "Method": request.get("method", "N/A"),
+        "Status Code": response.get("status"),
+        "Status Text": response.get("statusText", "N/A"),
+        "Content Type": content.get("mimeType"),
+        "Server IP": entry.get("serverIPAddress"),
+        "Page": entry.get("pageref"),
+        "Started": entry.get("startedDateTime"),
+        "Total (ms)": entry.get("time"),
+        "Blocked (ms)": timings.get("blocked"),
+        "DNS (ms)": timings.get("dns"),
+        "Connect (ms)": timings.get("connect"),
+        "SSL (ms)": timings.get("ssl"),
+        "Send (ms)": timings.get("send"),
+        "Wait (ms)": timings.get("wait"),
+        "Receive (ms)": timings.get("receive"),
+        "Request Header Bytes": request.get("headersSize"),
+        "Request Body Bytes": request.get("bodySize"),
+        "Response Header Bytes": response.get("headersSize"),
+        "Response Body Bytes": response.get("bodySize"),
+        "Content Bytes": content.get("size"),
+        "Transfer Bytes": response.get("_transferSize"),  # Chromium's on-the-wire size, when present
+    }
+
+
+def add_headers(columns, entry_id, entry):
+    """Append the request and response headers of one entry to the long-format `columns`."""
+    for direction in ("request", "response"):
+        for header in entry.get(direction, {}).get("headers", []):
+            columns["Entry"].append(entry_id)
+            columns["Direction"].append(direction)
+            columns["Name"].append(header.get("name"))
+            columns["Value"].append(header.get("value"))
+
+
+def header_batch(columns):
+    """A HEADER_SCHEMA RecordBatch; the string columns are dictionary-encoded, so each distinct
+    name and value is stored once per batch and repeated ones cost a 4-byte code."""
+    names = pc.utf8_lower(pa.array(columns["Name"], pa.string()))
+    return pa.RecordBatch.from_arrays([
+        pa.array(columns["Entry"], pa.int64()),
+        pa.array(columns["Direction"], pa.string()).dictionary_encode(),
+        names.dictionary_encode(),
+        pa.array(columns["Value"], pa.string()).dictionary_encode(),
+    ], schema=HEADER_SCHEMA)
+
+
+def blank_to_null(strings):
+    return pc.if_else(pc.equal(strings, ""), pa.scalar(None, pa.string()), strings)
+
+
+def typed_batch(columns, schema=ENTRY_SCHEMA):
+    """A RecordBatch of `schema` from raw entry_row() columns, converted column-wise with Arrow compute."""
+    arrays = {}
+    for field in schema:
+        values = columns.get(field.name)
+        if pa.types.is_floating(field.type) or pa.types.is_int64(field.type):
+            # HAR uses -1 for "not applicable / unknown" timings and sizes; those become null
+            numbers = pa.array(values, pa.float64())
+            numbers = pc.if_else(pc.less(numbers, 0), pa.scalar(None, pa.float64()), numbers)
+            arrays[field.name] = numbers.cast(field.type, safe=False)
+        elif field.name == "Started":
+            arrays[field.name] = timestamps(values, field.type)
+        elif field.name != "Host":
+            arrays[field.name] = pa.array(values, field.type)
+
+    url_host = pc.extract_regex(arrays["URL"], r"^[a-zA-Z][\w+.-]*://(?P<host>[^/?#]*)")
+    arrays["Host"] = blank_to_null(pc.struct_field(url_host, [0]))
+    mime_type = pc.replace_substring_regex(arrays["Content Type"], r";.*", "")
+    arrays["Content Type"] = blank_to_null(pc.utf8_lower(pc.utf8_trim_whitespace(mime_type)))
+    arrays["Server IP"] = blank_to_null(arrays["Server IP"])
+    sizes = pc.add(arrays["Response Header Bytes"], arrays["Response Body Bytes"])
+    arrays["Transfer Bytes"] = pc.coalesce(arrays["Transfer Bytes"], sizes)
+    return pa.RecordBatch.from_arrays([arrays[name] for name in schema.names], schema=schema)
+
+
+def timestamps(values, type):
+    """ISO 8601 startedDateTime strings as UTC timestamps; unparseable values become null."""
+    strings = pa.array(values, pa.string())
+    try:
+        return strings.cast(type)
+    except pa.ArrowInvalid:
+        pass  # a malformed value somewhere in the batch: fall back to parsing one at a time
+    parsed = []
+    for value in values:
+        try:
+            parsed.append(datetime.datetime.fromisoformat(value).astimezone(datetime.timezone.utc))
+        except (TypeError, ValueError):
+            parsed.append(None)
+    return pa.array(parsed, type)
+
+
+def record_batches(entries, rows=BATCH_ROWS, schema=ENTRY_SCHEMA):
+    """(entries, headers) column batches of `rows` entries each; only one pair is held in memory at a time."""
+    names = [name for name in schema.names if name != "Host"]
+    columns = {name: [] for name in names}
+    headers = {name: [] for name in HEADER_SCHEMA.names}
+    count = 0
+    for entry_id, entry in enumerate(entries):
+        for name, value in entry_row(entry).items():
+            columns[name].append(value)
+        add_headers(headers, entry_id, entry)
+        count += 1
+        if count == rows:
+            yield typed_batch(columns, schema), header_batch(headers)
+            columns = {name: [] for name in names}
+            headers = {name: [] for name in HEADER_SCHEMA.names}
+            count = 0
+    if count:
+        yield typed_batch(columns, schema), header_batch(headers)
+
+
+def parse_har(source, *writers, header_writers=(), preview_rows=PREVIEW_ROWS, rows=BATCH_ROWS, progress=None):
+    """Stream the entries of `source` into each of `writers` (export.TableWriter) batch by batch,
+    and their headers (HEADER_SCHEMA) into each of `header_writers`.
+
+    Returns (preview, count): the first `preview_rows` entries as a DataFrame
+    and the number of entries written. `progress(bytes_read)` is called after
+    every batch when `source` is a file object.
+    """
+    preview = []
+    count = 0
+    for batch, headers in record_batches(iter_entries(source), rows):
+        for writer in writers:
+            writer.write_arrow(batch)
+        for writer in header_writers:
+            writer.write_arrow(headers)
+        if count < preview_rows:
+            preview.append(batch.slice(0, preview_rows - count))
+        count += batch.num_rows
+        if progress is not None and hasattr(source, "tell"):
+            progress(source.tell())
+    table = pa.Table.from_batches(preview, schema=ENTRY_SCHEMA)
+    return table.to_pandas(types_mapper=NULLABLE_INTS.get), count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the entries of a HAR file into a table, streaming.")
+    parser.add_argument("har", help="HAR file")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())), default="parquet")
+    parser.add_argument("--out", default=None, help="output file (default <har name>.<format>)")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS)
+    args = parser.parse_args()
+
+    out = args.out or f"{os.path.splitext(args.har)[0]}.{args.format}"
+    stem, extension = os.path.splitext(out)
+    headers_out = f"{stem}_headers{extension}"
+    writer, header_writer = TableWriter(out, args.format), TableWriter(headers_out, args.format)
+    try:
+        _, count = parse_har(args.har, writer, header_writers=[header_writer], preview_rows=0, rows=args.batch_rows)
+    finally:
+        writer.close()
+        header_writer.close()
+    print(f"Wrote {count} entries to {out} and their headers to {headers_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+
+from har import PHASES
+
+# --- Constants ---
+PERCENTILES = [0.5, 0.9, 0.95, 0.99]
+PHASE_COLUMNS = [f"{phase} (ms)" for phase in PHASES]
+PHASE_COLORS = ["#c9c9c9", "#1f9e89", "#f28e2b", "#b07aa1", "#4e79a7", "#59a14f", "#76b7b2"]
+WATERFALL_ROWS = 300  # requests drawn in the waterfall chart
+
+
+def load_entries(path):
+    """The typed entry table written by har.parse_har; the row number is the entry id used by the header table."""
+    return pd.read_parquet(path)
+
+
+def is_error(df):
+    return df["Status Code"].fillna(0).to_numpy() >= 400
+
+
+def percentile_columns(values, q=PERCENTILES):
+    return {f"p{round(p * 100)}": values.quantile(p) for p in q}
+
+
+# --- Aggregates ---
+def latency_percentiles(df, column="Total (ms)", q=PERCENTILES):
+    """Percentiles of `column` over all requests, as a one-row-per-percentile Series."""
+    return pd.Series(percentile_columns(df[column], q), name=column)
+
+
+def phase_breakdown(df):
+    """Per timing phase: requests that spent time in it, mean/median/p95, and share of all time spent."""
+    phases = df[PHASE_COLUMNS]
+    # HAR counts SSL inside Connect; take it out so the shares add up to 100%
+    phases = phases.assign(**{"Connect (ms)": phases["Connect (ms)"].sub(phases["SSL (ms)"], fill_value=0).clip(lower=0)})
+    totals = phases.sum()
+    summary = pd.DataFrame({
+        "Requests": phases.gt(0).sum(),
+        "Mean (ms)": phases.mean(),
+        "Median (ms)": phases.median(),
+        "p95 (ms)": phases.quantile(0.95),
+        "Share": totals / totals.sum() if totals.sum() else totals,
+    })
+    summary.index = PHASES
+    return summary
+
+
+def aggregate(df, by, q=PERCENTILES):
+    """Per value of `by` ("Host", "Content Type", ...): request count, errors, bytes,
+    latency percentiles and mean time per phase, busiest first."""
+    keys = df[by].fillna("(none)")
+    grouped = df.assign(Errors=is_error(df)).groupby(keys, sort=False)
+    summary = pd.DataFrame({
+        "Requests": grouped.size(),
+        "Errors": grouped["Errors"].sum(),
+        "Transfer Bytes": grouped["Transfer Bytes"].sum(),
+        "Content Bytes": grouped["Content Bytes"].sum(),
+        "Total Time (s)": grouped["Total (ms)"].sum() / 1000,
+    })
+    latency = grouped["Total (ms)"].quantile(q).unstack()
+    latency.columns = [f"p{round(p * 100)} (ms)" for p in latency.columns]
+    means = grouped[PHASE_COLUMNS].mean().add_prefix("Mean ")
+    return summary.join(latency).join(means).sort_values("Total Time (s)", ascending=False).rename_axis(by)
+
+
+# --- Waterfall ---
+def waterfall(df, page=None):
+    """Start/end offsets (ms from the first request) of every request and of each of its phases.
+
+    Phase segments are laid end to end from the request's start, as the
+    browser's network panel draws them; SSL is drawn as its own segment after
+    the rest of Connect.
+    """
+    if page is not None:
+        df = df[df["Page"] == page]
+    df = df.dropna(subset=["Started"]).sort_values("Started", kind="stable")
+    phases = df[PHASE_COLUMNS].fillna(0).clip(lower=0)
+    phases["Connect (ms)"] = (phases["Connect (ms)"] - phases["SSL (ms)"]).clip(lower=0)
+
+    start = (df["Started"] - df["Started"].min()).dt.total_seconds().to_numpy() * 1000
+    duration = df["Total (ms)"].fillna(phases.sum(axis=1)).to_numpy()
+    result = pd.DataFrame({"URL": df["URL"].to_numpy(), "Host": df["Host"].to_numpy(),
+                           "Start (ms)": start, "End (ms)": start + duration, "Duration (ms)": duration},
+                          index=df.index)
+    offsets = np.cumsum(phases.to_numpy(), axis=1)
+    for i, column in enumerate(PHASE_COLUMNS):
+        result[f"{column[:-5]} Start (ms)"] = start + (offsets[:, i - 1] if i else 0)
+        result[column] = phases[column].to_numpy()
+    return result
+
+
+def critical_path(wf):
+    """The chain of requests that determines when the last request finished.
+
+    Working back from the request that ends last, each step takes the request
+    that finished most recently before the current one started - the one
+    that most plausibly triggered it. Predecessors are found for all
+    requests at once with a binary search over the sorted end times; only
+    the walk along the chain is a loop. "Gap (ms)" is the idle time
+    (parsing, script execution) between a request and its predecessor.
+    """
+    if wf.empty:
+        return wf.assign(**{"Gap (ms)": []})
+    by_end = wf.sort_values("End (ms)", kind="stable")
+    ends = by_end["End (ms)"].to_numpy()
+    starts = by_end["Start (ms)"].to_numpy()
+    position = np.arange(len(by_end))
+    predecessor = np.searchsorted(ends, starts, side="right") - 1
+    # A zero-length request ends where it starts and would find itself
+    predecessor = np.where(predecessor >= position, position - 1, predecessor)
+
+    chain = [len(by_end) - 1]
+    while predecessor[chain[-1]] >= 0:
+        chain.append(predecessor[chain[-1]])
+    chain.reverse()
+
+    path = by_end.iloc[chain][["URL", "Host", "Start (ms)", "End (ms)", "Duration (ms)"]]
+    previous_end = np.concatenate([[0.0], ends[chain[:-1]]])
+    return path.assign(**{"Gap (ms)": np.maximum(path["Start (ms)"].to_numpy() - previous_end, 0)})
+
+
+def waterfall_figure(wf, critical=None, max_rows=WATERFALL_ROWS):
+    """Matplotlib waterfall of the first `max_rows` requests, critical-path requests outlined.
+
+    Every phase segment goes into one LineCollection; a bar patch per segment
+    takes seconds to draw for a few hundred requests.
+    """
+    import matplotlib.pyplot as plt
+    from matplotlib.lines import Line2D
+
+    wf = wf.iloc[:max_rows]
+    height = max(3, 0.12 * len(wf))
+    fig, ax = plt.subplots(figsize=(12, height))
+    row_points = 0.7 * 72 * (height - 1) / max(len(wf), 1)  # line width filling most of a row
+
+    rows = np.arange(len(wf))
+    if critical is not None:
+        on_path = wf.index.isin(critical.index)
+        ax.hlines(rows[on_path], wf["Start (ms)"][on_path], wf["End (ms)"][on_path],
+                  colors="red", linewidth=row_points + 2)
+    starts = np.concatenate([wf[f"{column[:-5]} Start (ms)"].to_numpy() for column in PHASE_COLUMNS])
+    lengths = np.concatenate([wf[column].to_numpy() for column in PHASE_COLUMNS])
+    colors = np.repeat(PHASE_COLORS, len(wf))
+    shown = lengths > 0
+    ax.hlines(np.tile(rows, len(PHASE_COLUMNS))[shown], starts[shown], (starts + lengths)[shown],
+              colors=colors[shown], linewidth=row_points)
+
+    handles = [Line2D([], [], color=color, linewidth=6) for color in PHASE_COLORS]
+    labels = list(PHASES)
+    if critical is not None:
+        handles.append(Line2D([], [], color="red", linewidth=6))
+        labels.append("Critical path")
+    ax.set_ylim(len(wf) - 0.5, -0.5)
+    ax.set_xlim(left=0)
+    ax.set_yticks([])
+    ax.set_xlabel("Time since first request (ms)")
+    ax.legend(handles, labels, loc="lower center", bbox_to_anchor=(0.5, 1.0), ncol=8, fontsize="small", frameon=False)
+    fig.tight_layout()
+    return fig
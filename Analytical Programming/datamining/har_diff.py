@@ -0,0 +1,180 @@
+import argparse
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from export import TableWriter
+from har import parse_har
+
+# --- Constants ---
+METRICS = {"Latency": "Total (ms)", "Wait": "Wait (ms)", "Size": "Content Bytes", "Transfer": "Transfer Bytes"}
+MIN_SAMPLES = 5  # requests per side before a template is tested
+ALPHA = 0.05  # false discovery rate across all tested templates
+MIN_CHANGE = 0.10  # relative change in the median below which a significant shift is not reported
+# URL normalization, applied in order: ids, hashes and fingerprinted file names become placeholders
+TEMPLATE_RULES = [
+    (r"[?#].*$", ""),  # query strings and fragments carry per-request values
+    (r"/[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}(?=/|$)", "/{uuid}"),
+    (r"/\d+(?=/|$)", "/{id}"),
+    (r"/[0-9a-fA-F]{16,}(?=/|$)", "/{hash}"),
+    (r"([.-])[0-9a-fA-F]{6,}(?=\.\w+$)", r"\1{hash}"),  # app.3f2a9c1b.js, chunk-5e1f0a9d.css
+    (r"([.-])[0-9a-zA-Z_-]{20,}(?=\.\w+$)", r"\1{hash}"),  # base64-ish build fingerprints
+]
+
+
+def url_templates(urls):
+    """Normalized URL template for each URL of a string Series, e.g.
+    https://a.com/users/42/app.3f2a9c1b.js?v=7 -> https://a.com/users/{id}/app.{hash}.js."""
+    templates = urls.astype("string")
+    for pattern, replacement in TEMPLATE_RULES:
+        templates = templates.str.replace(pattern, replacement, regex=True)
+    return templates
+
+
+# --- Parallel Parsing ---
+def parse_capture(har_path, out_path):
+    """Parse one HAR file into a Parquet entries table; runs in a worker process."""
+    writer = TableWriter(out_path, "parquet")
+    try:
+        _, count = parse_har(har_path, writer, preview_rows=0)
+    finally:
+        writer.close()
+    return count
+
+
+def parse_captures(har_paths, directory, max_workers=None):
+    """Parse HAR files in parallel worker processes; returns the Parquet path of each, in order."""
+    directory = Path(directory)
+    out_paths = [directory / f"capture_{i}.parquet" for i in range(len(har_paths))]
+    max_workers = max_workers or min(len(har_paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+        list(pool.map(parse_capture, har_paths, out_paths))
+    return out_paths
+
+
+def load_captures(paths, names, group):
+    """Entries of several parsed captures in one frame, labelled with capture name, group and URL template."""
+    frames = [pd.read_parquet(path).assign(Capture=name) for path, name in zip(paths, names)]
+    entries = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    return entries.assign(Group=group, Template=url_templates(entries["URL"])) if frames else entries
+
+
+# --- Comparison ---
+def mann_whitney(values, after, keys):
+    """Two-sided Mann-Whitney U p-values for every key at once.
+
+    Ranks are taken within each key over both groups together (ties get the
+    average rank); U and its tie-corrected variance are then sums over
+    groupbys, and the p-value uses the normal approximation, which is close
+    from a handful of samples per side. Returns a DataFrame indexed by key
+    with n_before, n_after, U and p.
+    """
+    frame = pd.DataFrame({"key": keys, "value": values, "after": after})
+    ranks = frame.groupby("key")["value"].rank()
+    grouped = frame.assign(rank_after=ranks.where(frame["after"], 0)).groupby("key")
+    n_after = grouped["after"].sum()
+    n = grouped.size()
+    n_before = n - n_after
+    u = grouped["rank_after"].sum() - n_after * (n_after + 1) / 2
+
+    ties = frame.groupby(["key", "value"]).size()
+    tie_term = (ties ** 3 - ties).groupby(level="key").sum().reindex(n.index, fill_value=0)
+    variance = n_after * n_before / 12 * ((n + 1) - tie_term / (n * (n - 1)).where(n > 1, 1))
+    mean = n_after * n_before / 2
+    z = (u - mean - 0.5 * np.sign(u - mean)) / np.sqrt(variance.where(variance > 0))
+
+    from scipy.stats import norm
+
+    p = pd.Series(2 * norm.sf(z.abs()), index=n.index)
+    p[(variance == 0) & (n_before > 0) & (n_after > 0)] = 1.0  # every value equal: no shift at all
+    return pd.DataFrame({"n_before": n_before, "n_after": n_after, "U": u, "p": p})
+
+
+def benjamini_hochberg(p):
+    """FDR-adjusted q-values for a Series of p-values (NaN stays NaN)."""
+    tested = p.dropna().sort_values()
+    m = len(tested)
+    if not m:
+        return p
+    q = tested * m / np.arange(1, m + 1)
+    q = np.minimum.accumulate(q[::-1])[::-1].clip(upper=1)
+    return q.reindex(p.index)
+
+
+def compare(before, after, metric="Total (ms)", min_samples=MIN_SAMPLES, alpha=ALPHA, min_change=MIN_CHANGE):
+    """Per URL template: median `metric` before and after, relative change and significance.
+
+    Templates with fewer than `min_samples` requests on either side are
+    listed but not tested. "Verdict" is "regression" or "improvement" when
+    the shift is significant after Benjamini-Hochberg correction across all
+    tested templates and the median moved by more than `min_change`.
+    Rows are sorted worst regression first.
+    """
+    both = pd.concat([before[["Template", metric]].assign(after=False),
+                      after[["Template", metric]].assign(after=True)], ignore_index=True).dropna(subset=[metric])
+    medians = both.groupby(["Template", "after"])[metric].median().unstack()
+    medians = medians.reindex(columns=[False, True])
+    result = mann_whitney(both[metric].to_numpy(), both["after"].to_numpy(), both["Template"].to_numpy())
+    result = result.rename_axis("Template")
+    result["Median Before"] = medians[False]
+    result["Median After"] = medians[True]
+    result["Change"] = (result["Median After"] - result["Median Before"]) / result["Median Before"].where(
+        result["Median Before"] > 0)
+
+    tested = (result["n_before"] >= min_samples) & (result["n_after"] >= min_samples)
+    result["p"] = result["p"].where(tested)
+    result["q"] = benjamini_hochberg(result["p"])
+    significant = (result["q"] < alpha) & (result["Change"].abs() > min_change)
+    result["Verdict"] = np.where(significant, np.where(result["Change"] > 0, "regression", "improvement"), "")
+    order = result["Verdict"].map({"regression": 0, "improvement": 1, "": 2})
+    return result.iloc[np.lexsort((-result["Change"].abs().fillna(0).to_numpy(), order.to_numpy()))]
+
+
+def capture_summary(entries):
+    """Requests, median/p95 latency and bytes per capture."""
+    grouped = entries.groupby(["Group", "Capture"], sort=False)
+    return pd.DataFrame({
+        "Requests": grouped.size(),
+        "Median (ms)": grouped["Total (ms)"].median(),
+        "p95 (ms)": grouped["Total (ms)"].quantile(0.95),
+        "Content Bytes": grouped["Content Bytes"].sum(),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HAR captures taken before and after a deploy.")
+    parser.add_argument("--before", nargs="+", required=True, help="baseline HAR files")
+    parser.add_argument("--after", nargs="+", required=True, help="HAR files to check for regressions")
+    parser.add_argument("--metric", choices=list(METRICS), default="Latency")
+    parser.add_argument("--min-samples", type=int, default=MIN_SAMPLES)
+    parser.add_argument("--alpha", type=float, default=ALPHA)
+    parser.add_argument("--min-change", type=float, default=MIN_CHANGE)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="write the full comparison to this CSV file")
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix="base-har-diff-")
+    try:
+        paths = parse_captures(args.before + args.after, directory, args.workers)
+        before = load_captures(paths[:len(args.before)], args.before, "Before")
+        after = load_captures(paths[len(args.before):], args.after, "After")
+        print(capture_summary(pd.concat([before, after], ignore_index=True)).to_string())
+        result = compare(before, after, METRICS[args.metric], args.min_samples, args.alpha, args.min_change)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    flagged = result[result["Verdict"] != ""]
+    print(f"\n{len(flagged)} of {int(result['p'].notna().sum())} tested templates changed significantly:")
+    if len(flagged):
+        print(flagged[["n_before", "n_after", "Median Before", "Median After", "Change", "q", "Verdict"]].to_string())
+    if args.out:
+        result.to_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()
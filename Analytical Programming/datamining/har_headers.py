@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+# --- Constants ---
+COOKIE_HEADERS = {"request": "cookie", "response": "set-cookie"}
+
+
+def load_headers(path):
+    """The long-format header table written by har.parse_har.
+
+    Direction, Name and Value come back as categoricals: every distinct
+    string is held once and each row stores an integer code, so a capture
+    whose headers repeat (most of them do) takes a fraction of the memory
+    of one JSON string per entry. Queries below match against the
+    categories and then select rows by code.
+    """
+    return pd.read_parquet(path).astype(
+        {"Direction": "category", "Name": "category", "Value": "category"})
+
+
+def select(headers, name=None, direction=None):
+    """Rows of `headers` for one header `name` (lower-case) and/or `direction` ("request"/"response")."""
+    mask = np.ones(len(headers), dtype=bool)
+    if name is not None:
+        mask &= (headers["Name"] == name.lower()).to_numpy()
+    if direction is not None:
+        mask &= (headers["Direction"] == direction).to_numpy()
+    return headers[mask]
+
+
+def value_bytes(values):
+    """UTF-8 length of each value of a categorical Series, computed once per distinct value."""
+    category_bytes = values.cat.categories.str.encode("utf-8").str.len().to_numpy()
+    codes = values.cat.codes.to_numpy()
+    return pd.Series(np.where(codes >= 0, category_bytes[codes], 0), index=values.index)
+
+
+def missing_header(headers, entry_count, name, direction="response"):
+    """Ids of the entries (0 .. entry_count - 1) that have no `name` header, e.g. responses without cache-control."""
+    present = select(headers, name, direction)["Entry"].to_numpy()
+    return np.setdiff1d(np.arange(entry_count), present)
+
+
+def large_cookies(headers, min_bytes, direction="request"):
+    """Cookie (request) or Set-Cookie (response) headers longer than `min_bytes`, largest first."""
+    cookies = select(headers, COOKIE_HEADERS[direction], direction)
+    sizes = value_bytes(cookies["Value"])
+    return cookies.assign(Bytes=sizes)[sizes > min_bytes].sort_values("Bytes", ascending=False)
+
+
+def header_summary(headers):
+    """Per (direction, name): how many entries send it, its distinct values and total bytes."""
+    sized = headers.assign(Bytes=value_bytes(headers["Value"]))
+    grouped = sized.groupby(["Direction", "Name"], observed=True)
+    summary = pd.DataFrame({
+        "Entries": grouped["Entry"].nunique(),
+        "Distinct Values": grouped["Value"].nunique(),
+        "Total Bytes": grouped["Bytes"].sum(),
+    })
+    return summary.sort_values("Total Bytes", ascending=False)
@@ -0,0 +1,147 @@
+import contextlib
+import functools
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+# --- Constants ---
+CACHE_DIR = Path(os.environ.get("BASE_HTTP_CACHE", Path.home() / ".cache" / "base-http"))
+MAX_BYTES = 512 * 2 ** 20  # total body size kept on disk before LRU eviction
+HTML_TTL = 60 * 60  # seconds a page is served without revalidation
+USER_AGENT = "Mozilla/5.0"
+
+
+# --- Disk Tier ---
+class DiskCache:
+    """Size-bounded LRU of byte bodies on disk with a per-entry expiry time.
+
+    Bodies are files named by the SHA-256 of their key, written atomically;
+    an SQLite index holds size, last access, expiry and free-form metadata
+    (ETag, Last-Modified, encoding). Expired entries are kept so they can be
+    revalidated; eviction drops least recently used entries once the total
+    size passes `max_bytes`.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.directory / "index.sqlite"
+        with self._db() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS entries "
+                       "(key TEXT PRIMARY KEY, size INTEGER, accessed REAL, expires REAL, meta TEXT)")
+
+    @contextlib.contextmanager
+    def _db(self):
+        db = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _path(self, key):
+        return self.directory / hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key):
+        """{"body", "fresh", "meta"} for `key`, or None when it is not cached."""
+        with self._db() as db:
+            row = db.execute("SELECT expires, meta FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            try:
+                body = self._path(key).read_bytes()
+            except FileNotFoundError:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+        expires, meta = row
+        return {"body": body, "fresh": expires is None or expires > time.time(), "meta": json.loads(meta)}
+
+    def put(self, key, body, ttl=None, **meta):
+        """Store `body` for `ttl` seconds (None = until evicted)."""
+        path = self._path(key)
+        # One tmp file per process and thread: Streamlit sessions are threads of one process,
+        # and two of them storing the same page must not write into the same file
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)  # atomic, so readers see the old body or the new one, never a partial one
+        now = time.time()
+        with self._db() as db:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                       (key, len(body), now, None if ttl is None else now + ttl, json.dumps(meta)))
+        self._evict()
+
+    def refresh(self, key, ttl=None):
+        """Mark a revalidated entry fresh for another `ttl` seconds."""
+        now = time.time()
+        with self._db() as db:
+            db.execute("UPDATE entries SET accessed = ?, expires = ? WHERE key = ?",
+                       (now, None if ttl is None else now + ttl, key))
+
+    def _evict(self):
+        with self._db() as db:
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            for key, size in db.execute("SELECT key, size FROM entries ORDER BY accessed").fetchall():
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._path(key).unlink(missing_ok=True)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+@functools.lru_cache(maxsize=1)
+def default_cache():
+    return DiskCache()
+
+
+# --- HTTP with Revalidation ---
+def conditional_headers(entry):
+    """If-None-Match / If-Modified-Since headers for revalidating a cached entry."""
+    if entry is None:
+        return {}
+    headers = {}
+    if entry["meta"].get("etag"):
+        headers["If-None-Match"] = entry["meta"]["etag"]
+    if entry["meta"].get("last_modified"):
+        headers["If-Modified-Since"] = entry["meta"]["last_modified"]
+    return headers
+
+
+def page_key(url):
+    return f"GET {url}"
+
+
+def decode(entry):
+    return entry["body"].decode(entry["meta"].get("encoding") or "utf-8", errors="replace")
+
+
+def get_html(url, ttl=HTML_TTL, cache=None, timeout=30):
+    """Text of `url`, served from the disk cache while fresh.
+
+    Once stale, the page is revalidated with the stored ETag/Last-Modified; a
+    304 just renews the entry. Raises requests.HTTPError for error statuses.
+    """
+    cache = cache or default_cache()
+    key = page_key(url)
+    entry = cache.get(key)
+    if entry is not None and entry["fresh"]:
+        return decode(entry)
+
+    headers = {"User-Agent": USER_AGENT, **conditional_headers(entry)}
+    response = requests.get(url, headers=headers, timeout=timeout)
+    if response.status_code == 304 and entry is not None:
+        cache.refresh(key, ttl)
+        return decode(entry)
+    response.raise_for_status()
+    cache.put(key, response.content, ttl, etag=response.headers.get("ETag"),
+              last_modified=response.headers.get("Last-Modified"), encoding=response.encoding)
+    return response.text
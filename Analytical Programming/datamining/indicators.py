@@ -0,0 +1,265 @@
+import functools
+
+import numpy as np
+
+# --- Constants ---
+SMA_WINDOW = 20
+EMA_SPAN = 20
+RSI_PERIOD = 14
+MACD_SPANS = (12, 26, 9)  # fast EMA, slow EMA, signal EMA
+BOLLINGER_WINDOW = 20
+BOLLINGER_WIDTH = 2.0  # standard deviations from the middle band
+ATR_PERIOD = 14
+VOLATILITY_WINDOW = 21  # trading days of log returns
+TRADING_DAYS = 252  # annualization factor for daily volatility
+PRICE_INDICATORS = ["SMA", "EMA", "Bollinger"]  # drawn on the price axis; the others get their own
+
+
+def field(panel, name):
+    """One field of a panel as a float symbol x time array (a single series becomes one row)."""
+    return np.atleast_2d(np.asarray(panel[name], dtype="float64"))
+
+
+# --- Kernels ---
+def _smooth_columns(x, alpha, last):
+    """Exponential smoothing one time step at a time, all symbols per step (the NumPy fallback)."""
+    out = np.empty_like(x)
+    for t in range(x.shape[1]):
+        value = x[:, t]
+        last = np.where(np.isnan(last), value, np.where(np.isnan(value), last, last + alpha * (value - last)))
+        out[:, t] = last
+    return out
+
+
+def _smooth_loop(x, alpha, last, out):
+    for i in range(x.shape[0]):
+        value = last[i]
+        for t in range(x.shape[1]):
+            v = x[i, t]
+            if v == v:  # not NaN
+                value = v if value != value else value + alpha * (v - value)
+            out[i, t] = value
+
+
+@functools.lru_cache(maxsize=1)
+def _compiled_smooth():
+    """numba-compiled smoothing loop, or None when numba is not installed."""
+    try:
+        import numba
+    except ImportError:
+        return None
+    return numba.njit(cache=True)(_smooth_loop)
+
+
+def smooth(x, alpha, last=None):
+    """Exponential smoothing along time: s[t] = s[t-1] + alpha * (x[t] - s[t-1]).
+
+    Each symbol's series is seeded with its first value (or continues from
+    `last`, one value per symbol) and a NaN bar carries the previous value.
+    The recursion runs in numba when it is installed, otherwise as a NumPy
+    loop over time that updates all symbols at once.
+    """
+    last = np.full(x.shape[0], np.nan) if last is None else np.asarray(last, dtype="float64")
+    compiled = _compiled_smooth()
+    if compiled is None:
+        return _smooth_columns(x, alpha, last)
+    out = np.empty_like(x)
+    compiled(np.ascontiguousarray(x), alpha, last, out)
+    return out
+
+
+def rolling_moments(x, window):
+    """Rolling mean and population variance over `window` bars; NaN until a window has no missing bar.
+
+    Sums come from cumulative sums, so the cost does not grow with the
+    window. Each symbol is shifted by its first value beforehand, which
+    keeps the sums of squares small enough not to cancel.
+    """
+    valid = ~np.isnan(x)
+    shift = np.nan_to_num(x[np.arange(x.shape[0]), valid.argmax(axis=1)])[:, None]
+    centred = np.where(valid, x - shift, 0.0)
+
+    def rolling_sum(values):
+        sums = np.cumsum(values, axis=1)
+        sums[:, window:] = sums[:, window:] - sums[:, :-window]
+        return sums
+
+    count, total, squares = (rolling_sum(v) for v in (valid.astype("float64"), centred, centred * centred))
+    mean = total / window
+    variance = np.maximum(squares / window - mean * mean, 0)
+    incomplete = count < window
+    mean[incomplete] = np.nan
+    variance[incomplete] = np.nan
+    return mean + shift, variance
+
+
+def _with_tail(x, state, keep):
+    """`x` preceded by the bars kept in `state`, the number of those bars, and the new state's tail."""
+    if state is not None:
+        x = np.concatenate([state["tail"], x], axis=1)
+    return x, 0 if state is None else state["tail"].shape[1], x[:, max(x.shape[1] - keep, 0):]
+
+
+def ffill(x, last=None):
+    """Each bar, or the most recent bar before it when it is NaN (`last` seeds the first one)."""
+    if last is not None:
+        x = np.concatenate([np.asarray(last, dtype="float64")[:, None], x], axis=1)
+    index = np.where(np.isnan(x), 0, np.arange(x.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = np.take_along_axis(x, index, axis=1)
+    return filled if last is None else filled[:, 1:]
+
+
+# --- Indicators ---
+# Every indicator takes a panel - {"Open": ..., "Close": ..., ...}, each a float
+# array shaped symbol x time - and an optional state, and returns (output, state).
+# The output is one symbol x time array, or a {part: array} dict for indicators
+# with several lines. Passing the returned state back with only the bars that
+# came next continues the computation exactly where it stopped.
+def sma(panel, state=None, window=SMA_WINDOW, source="Close"):
+    """Simple moving average."""
+    x, skip, tail = _with_tail(field(panel, source), state, window - 1)
+    mean, _ = rolling_moments(x, window)
+    return mean[:, skip:], {"tail": tail}
+
+
+def ema(panel, state=None, span=EMA_SPAN, source="Close"):
+    """Exponential moving average, alpha = 2 / (span + 1)."""
+    out = smooth(field(panel, source), 2 / (span + 1), None if state is None else state["last"])
+    return out, {"last": out[:, -1]}
+
+
+def rsi(panel, state=None, period=RSI_PERIOD):
+    """Relative strength index (0-100) with Wilder's smoothing of gains and losses."""
+    close = field(panel, "Close")
+    state = state or {"close": np.full(close.shape[0], np.nan), "gain": None, "loss": None}
+    filled = ffill(close, state["close"])
+    change = close - np.concatenate([state["close"][:, None], filled[:, :-1]], axis=1)
+    gain = smooth(np.maximum(change, 0), 1 / period, state["gain"])
+    loss = smooth(np.maximum(-change, 0), 1 / period, state["loss"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(gain + loss > 0, 100 * gain / (gain + loss), 50.0)
+    out[np.isnan(gain)] = np.nan
+    return out, {"close": filled[:, -1], "gain": gain[:, -1], "loss": loss[:, -1]}
+
+
+def macd(panel, state=None, spans=MACD_SPANS):
+    """MACD line (fast EMA - slow EMA), its signal EMA and the histogram between them."""
+    fast_span, slow_span, signal_span = spans
+    close = field(panel, "Close")
+    state = state or {"fast": None, "slow": None, "signal": None}
+    fast = smooth(close, 2 / (fast_span + 1), state["fast"])
+    slow = smooth(close, 2 / (slow_span + 1), state["slow"])
+    line = fast - slow
+    signal = smooth(line, 2 / (signal_span + 1), state["signal"])
+    output = {"Line": line, "Signal": signal, "Histogram": line - signal}
+    return output, {"fast": fast[:, -1], "slow": slow[:, -1], "signal": signal[:, -1]}
+
+
+def bollinger(panel, state=None, window=BOLLINGER_WINDOW, width=BOLLINGER_WIDTH):
+    """Bollinger bands: the moving average and `width` population standard deviations either side."""
+    x, skip, tail = _with_tail(field(panel, "Close"), state, window - 1)
+    mean, variance = rolling_moments(x, window)
+    band = width * np.sqrt(variance)
+    output = {"Middle": mean, "Upper": mean + band, "Lower": mean - band}
+    return {part: values[:, skip:] for part, values in output.items()}, {"tail": tail}
+
+
+def atr(panel, state=None, period=ATR_PERIOD):
+    """Average true range with Wilder's smoothing; the first bar's true range is its high - low."""
+    high, low, close = field(panel, "High"), field(panel, "Low"), field(panel, "Close")
+    state = state or {"close": np.full(close.shape[0], np.nan), "atr": None}
+    filled = ffill(close, state["close"])
+    previous = np.concatenate([state["close"][:, None], filled[:, :-1]], axis=1)
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - previous), np.abs(low - previous)))
+    out = smooth(true_range, 1 / period, state["atr"])
+    return out, {"close": filled[:, -1], "atr": out[:, -1]}
+
+
+def volatility(panel, state=None, window=VOLATILITY_WINDOW, annualize=TRADING_DAYS):
+    """Annualized rolling standard deviation (ddof=1) of daily log returns."""
+    x, skip, tail = _with_tail(field(panel, "Close"), state, window)
+    returns = np.full(x.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[:, 1:] = np.log(x[:, 1:] / x[:, :-1])
+    _, variance = rolling_moments(returns, window)
+    return np.sqrt(variance * window / (window - 1) * annualize)[:, skip:], {"tail": tail}
+
+
+def drawdown(panel, state=None):
+    """Decline from the running peak close, from 0 down to -1."""
+    close = field(panel, "Close")
+    peak = np.fmax.accumulate(close, axis=1)
+    if state is not None:
+        peak = np.fmax(peak, state["peak"][:, None])
+    return close / peak - 1, {"peak": peak[:, -1]}
+
+
+# Name -> (function, parameters); functions returning parts are named "<name> <part>"
+INDICATORS = {
+    "SMA": (sma, {}),
+    "EMA": (ema, {}),
+    "RSI": (rsi, {}),
+    "MACD": (macd, {}),
+    "Bollinger": (bollinger, {}),
+    "ATR": (atr, {}),
+    "Volatility": (volatility, {}),
+    "Drawdown": (drawdown, {}),
+}
+
+
+def flatten(name, output):
+    if isinstance(output, dict):
+        return {f"{name} {part}": values for part, values in output.items()}
+    return {name: output}
+
+
+def compute(panel, names=None, indicators=INDICATORS):
+    """{output name: symbol x time array} for the indicators in `names` (default: all of them)."""
+    result = {}
+    for name in names or list(indicators):
+        function, params = indicators[name]
+        result.update(flatten(name, function(panel, **params)[0]))
+    return result
+
+
+class IndicatorEngine:
+    """Indicators of a fixed set of symbols whose bars arrive over time.
+
+    update() computes the indicators for new bars only, from the state the
+    previous call left behind: the last smoothed values of the recursive
+    indicators, and the last window of bars for the rolling ones. So
+    appending a bar costs the same however long the history is. The
+    history of every output is kept in buffers that double when full.
+    """
+
+    def __init__(self, names=None, indicators=INDICATORS):
+        self.indicators = {name: indicators[name] for name in names or list(indicators)}
+        self.state = {}
+        self.length = 0
+        self._buffers = {}
+
+    def update(self, panel):
+        """Add the bars of `panel` (symbol x new bars) and return the indicators for those bars."""
+        if not np.shape(next(iter(panel.values())))[-1]:
+            return {}
+        result = {}
+        for name, (function, params) in self.indicators.items():
+            output, self.state[name] = function(panel, self.state.get(name), **params)
+            result.update(flatten(name, output))
+        added = next(iter(result.values())).shape[1] if result else 0
+        for name, values in result.items():
+            buffer = self._buffers.get(name)
+            if buffer is None or buffer.shape[1] < self.length + added:
+                grown = np.empty((values.shape[0], max(2 * self.length, self.length + added, 1)))
+                if buffer is not None:
+                    grown[:, :self.length] = buffer[:, :self.length]
+                buffer = self._buffers[name] = grown
+            buffer[:, self.length:self.length + added] = values
+        self.length += added
+        return result
+
+    @property
+    def values(self):
+        """{output name: symbol x time array} over every bar seen so far (views into the buffers)."""
+        return {name: buffer[:, :self.length] for name, buffer in self._buffers.items()}
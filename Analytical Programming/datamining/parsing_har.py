@@ -1,59 +1,173 @@
-import streamlit as st
-import json
+import os
+import shutil
+
 import pandas as pd
-from io import BytesIO
+import streamlit as st
+
+from export import FORMATS, TableWriter, new_bundle
+from har import parse_har
+from har_analytics import (WATERFALL_ROWS, aggregate, critical_path, latency_percentiles, load_entries,
+                           phase_breakdown, waterfall, waterfall_figure)
+from har_diff import (ALPHA, METRICS, MIN_CHANGE, MIN_SAMPLES, capture_summary, compare, load_captures,
+                      parse_captures)
+from har_headers import header_summary, large_cookies, load_headers, missing_header
 
 st.title("HAR File Parser and CSV Exporter")
 
-# File uploader
-uploaded_file = st.file_uploader("Upload a HAR file", type=["har"])
-
-if uploaded_file is not None:
-    try:
-        # Load HAR file
-        har_data = json.load(uploaded_file)
-        
-        # Extract network requests
-        entries = har_data.get("log", {}).get("entries", [])
-
-        if not entries:
-            st.warning("No network request entries found in the HAR file.")
-        else:
-            # Extract relevant data
-            extracted_data = []
-            for entry in entries:
-                request = entry.get("request", {})
-                response = entry.get("response", {})
-                timings = entry.get("timings", {})
-
-                extracted_data.append({
-                    "URL": request.get("url", "N/A"),
-                    "Method": request.get("method", "N/A"),
-                    "Status Code": response.get("status", "N/A"),
-                    "Status Text": response.get("statusText", "N/A"),
-                    "Request Headers": json.dumps(request.get("headers", [])),
-                    "Response Headers": json.dumps(response.get("headers", [])),
-                    "Response Time (ms)": timings.get("wait", "N/A"),
-                })
-
-            # Convert to DataFrame
-            df = pd.DataFrame(extracted_data)
-
-            # Display the data
-            st.write("### Parsed HAR Data:")
-            st.dataframe(df)
-
-            # Convert to CSV
-            csv_buffer = BytesIO()
-            df.to_csv(csv_buffer, index=False)
-            csv_buffer.seek(0)
-
-            # Provide download button
-            st.download_button(
-                label="Download CSV",
-                data=csv_buffer,
-                file_name="parsed_har_data.csv",
-                mime="text/csv"
-            )
-    except Exception as e:
-        st.error(f"Error parsing HAR file: {e}")
+mode = st.radio("Mode", ["Single capture", "Compare captures (before/after)"], horizontal=True)
+
+if mode == "Single capture":
+    # File uploader (Streamlit keeps uploads in memory, so very large captures are better read from disk)
+    uploaded_file = st.file_uploader("Upload a HAR file", type=["har"])
+    har_path = st.text_input("...or the path of a HAR file on the server:")
+    export_format = FORMATS[st.selectbox("Export format", list(FORMATS))]
+
+    source = uploaded_file if uploaded_file is not None else har_path.strip() or None
+
+    if source is not None:
+        try:
+            # Parse once per file and format; widget changes below only rerun the analytics
+            key = (uploaded_file.file_id, export_format) if uploaded_file is not None else \
+                (source, os.path.getmtime(source), export_format)
+            if st.session_state.get("har_key") != key:
+                total = uploaded_file.size if uploaded_file is not None else os.path.getsize(source)
+                progress_bar = st.progress(0)
+
+                # Entries are streamed one at a time and written to disk in column batches (see har.py);
+                # the analytics read a Parquet copy, which is the export itself when Parquet is chosen
+                bundle = new_bundle(st.session_state, "parsed_har_data", export_format)
+                writers = [bundle.table("parsed_har_data")]
+                header_writers = [bundle.table("headers")]  # long format: entry id, direction, name, value
+                if export_format != "parquet":
+                    writers.append(TableWriter(bundle.directory / "analytics.parquet", "parquet"))
+                    header_writers.append(TableWriter(bundle.directory / "analytics_headers.parquet", "parquet"))
+                try:
+                    preview, count = parse_har(source, *writers, header_writers=header_writers,
+                                               progress=lambda done: progress_bar.progress(min(done / total, 1.0)))
+                finally:
+                    for writer in writers + header_writers:
+                        writer.close()
+                progress_bar.empty()
+                st.session_state.har_key = key
+                st.session_state.har_parsed = (preview, count, writers[-1].path, header_writers[-1].path)
+
+            preview, count, entries_path, headers_path = st.session_state.har_parsed
+            bundle = st.session_state["export"]
+
+            if not count:
+                st.warning("No network request entries found in the HAR file.")
+            else:
+                entries = load_entries(entries_path)
+                headers = load_headers(headers_path)
+                requests_tab, timings_tab, hosts_tab, types_tab, waterfall_tab, headers_tab = st.tabs(
+                    ["Requests", "Timings", "Hosts", "Content types", "Waterfall", "Headers"])
+
+                with requests_tab:
+                    # Display the data
+                    st.write(f"### Parsed HAR Data: {count:,} requests")
+                    if count > len(preview):
+                        st.caption(f"Showing the first {len(preview):,}; the download has all of them.")
+                    st.dataframe(preview)
+
+                    # Provide download button (the file is read only when clicked)
+                    bundle.download_button()
+
+                with timings_tab:
+                    st.write("### Request Time Percentiles (ms)")
+                    st.dataframe(latency_percentiles(entries).to_frame().T)
+                    st.write("### Time per Phase")
+                    st.dataframe(phase_breakdown(entries).style.format({"Share": "{:.1%}"}))
+
+                with hosts_tab:
+                    st.dataframe(aggregate(entries, "Host"))
+
+                with types_tab:
+                    st.dataframe(aggregate(entries, "Content Type"))
+
+                with waterfall_tab:
+                    pages = sorted(entries["Page"].dropna().unique())
+                    page = st.selectbox("Page", pages) if pages else None
+                    wf = waterfall(entries, page)
+                    critical = critical_path(wf)
+                    st.write(f"Last request finished after {wf['End (ms)'].max():,.0f} ms "
+                             f"({len(wf):,} requests, {len(critical)} on the critical path).")
+                    if len(wf) > WATERFALL_ROWS:
+                        st.caption(f"Chart shows the first {WATERFALL_ROWS} requests.")
+                    st.pyplot(waterfall_figure(wf, critical))
+                    st.write("### Critical Path")
+                    st.dataframe(critical)
+
+                with headers_tab:
+                    st.write("### Headers by Name")
+                    st.dataframe(header_summary(headers))
+
+                    col1, col2 = st.columns(2)
+                    name = col1.text_input("Responses missing header", value="cache-control")
+                    missing = missing_header(headers, count, name.strip())
+                    col1.write(f"{len(missing):,} of {count:,} responses have no `{name.strip().lower()}` header.")
+                    col1.dataframe(entries.loc[missing, ["URL", "Status Code", "Content Type"]])
+
+                    min_bytes = col2.number_input("Cookies larger than (bytes)", min_value=0, value=4096, step=256)
+                    cookies = large_cookies(headers, min_bytes)
+                    col2.write(f"{len(cookies):,} requests send a larger cookie.")
+                    col2.dataframe(cookies.join(entries["URL"], on="Entry")[["URL", "Bytes"]])
+        except Exception as e:
+            st.error(f"Error parsing HAR file: {e}")
+
+else:
+    # Captures from before and after a deploy, parsed in parallel worker processes (see har_diff.py)
+    col1, col2 = st.columns(2)
+    before_files = col1.file_uploader("Before: HAR files", type=["har"], accept_multiple_files=True)
+    before_paths = col1.text_area("...or paths on the server (one per line)", key="before_paths")
+    after_files = col2.file_uploader("After: HAR files", type=["har"], accept_multiple_files=True)
+    after_paths = col2.text_area("...or paths on the server (one per line)", key="after_paths")
+    col1, col2, col3, col4 = st.columns(4)
+    metric = METRICS[col1.selectbox("Metric", list(METRICS))]
+    min_samples = col2.number_input("Min. requests per side", min_value=2, value=MIN_SAMPLES)
+    alpha = col3.number_input("False discovery rate", min_value=0.001, max_value=0.5, value=ALPHA, step=0.01)
+    min_change = col4.number_input("Min. change of the median (%)", min_value=0.0, value=MIN_CHANGE * 100,
+                                   step=5.0) / 100
+
+    if st.button("Compare"):
+        try:
+            bundle = new_bundle(st.session_state, "har_comparison", "csv")
+            st.session_state.pop("har_key", None)  # the single-capture files went with the previous bundle
+            groups = {}
+            for group, files, paths in [("Before", before_files, before_paths), ("After", after_files, after_paths)]:
+                # Workers read from disk, so uploads are spooled to the bundle's directory first
+                names, sources = [], []
+                for i, file in enumerate(files):
+                    path = bundle.directory / f"{group}_{i}.har"
+                    with open(path, "wb") as f:
+                        shutil.copyfileobj(file, f)
+                    names.append(file.name)
+                    sources.append(path)
+                for line in paths.splitlines():
+                    if line.strip():
+                        names.append(line.strip())
+                        sources.append(line.strip())
+                groups[group] = (names, sources)
+
+            if not groups["Before"][1] or not groups["After"][1]:
+                st.warning("Please give at least one capture on each side.")
+            else:
+                all_sources = groups["Before"][1] + groups["After"][1]
+                with st.spinner(f"Parsing {len(all_sources)} captures..."):
+                    parsed = parse_captures(all_sources, bundle.directory)
+                before = load_captures(parsed[:len(groups["Before"][1])], groups["Before"][0], "Before")
+                after = load_captures(parsed[len(groups["Before"][1]):], groups["After"][0], "After")
+
+                st.write("### Captures")
+                st.dataframe(capture_summary(pd.concat([before, after], ignore_index=True)))
+
+                result = compare(before, after, metric, min_samples, alpha, min_change)
+                flagged = result[result["Verdict"] != ""]
+                st.write(f"### {len(flagged)} of {int(result['p'].notna().sum())} tested URL templates changed")
+                st.dataframe(flagged.style.format({"Change": "{:+.1%}", "p": "{:.2g}", "q": "{:.2g}"}))
+                with st.expander("All URL templates"):
+                    st.dataframe(result)
+
+                bundle.add("har_comparison", result.reset_index())
+                bundle.download_button("Download Comparison")
+        except Exception as e:
+            st.error(f"Error comparing HAR files: {e}")
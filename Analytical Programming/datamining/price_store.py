@@ -0,0 +1,253 @@
+import abc
+import datetime
+import functools
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# --- Constants ---
+STORE_DIR = Path(os.environ.get("BASE_PRICE_STORE", Path.home() / ".cache" / "base-prices"))
+FIXTURES_DIR = os.environ.get("BASE_PRICE_FIXTURES")  # serve prices from local files instead of Yahoo Finance
+LIVE_PRICE_TTL = 15 * 60  # seconds the apps keep a range in memory; today's bar is refetched after that
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+MAX_EMPTY_BUSINESS_DAYS = 4  # an empty answer for a longer gap is treated as a failed fetch, not as "no trading"
+BATCH_SYMBOLS = 50  # symbols per download request
+FETCH_WORKERS = 4  # download requests in flight at once
+RANGES_KEY = b"base.ranges"  # Parquet metadata key holding the date ranges a symbol file covers
+
+
+def normalize(df):
+    """OHLCV frame with a tz-naive DatetimeIndex named Date, one column per field, sorted by date."""
+    if df is None or df.empty:
+        return pd.DataFrame({column: pd.Series(dtype="float64") for column in COLUMNS},
+                            index=pd.DatetimeIndex([], name="Date"))
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.droplevel([level for level in range(1, df.columns.nlevels)], axis=1)  # yfinance's (Price, Ticker)
+    df = df[[column for column in COLUMNS if column in df.columns]].astype("float64")
+    index = pd.DatetimeIndex(df.index)
+    df.index = (index.tz_localize(None) if index.tz is not None else index).normalize().rename("Date")
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+# --- Sources ---
+class PriceSource(abc.ABC):
+    """Where a PriceStore gets bars it does not hold yet.
+
+    Subclasses implement fetch(symbol, start, end), returning daily OHLCV
+    rows for start <= date < end (any shape normalize() accepts; empty
+    when there is nothing).
+    """
+
+    name = "source"
+
+    @abc.abstractmethod
+    def fetch(self, symbol, start, end):
+        """Daily bars of `symbol` for start <= date < end."""
+
+    def fetch_many(self, symbols, start, end):
+        """{symbol: bars} for several symbols over the same dates; sources with a batch API override this."""
+        return {symbol: self.fetch(symbol, start, end) for symbol in symbols}
+
+
+class YahooSource(PriceSource):
+    name = "yahoo"
+
+    def fetch(self, symbol, start, end):
+        import yfinance as yf
+
+        return yf.download(symbol, start=start, end=end, progress=False)
+
+    def fetch_many(self, symbols, start, end):
+        import yfinance as yf
+
+        # One request for the whole batch; columns come back as (Ticker, Price)
+        df = yf.download(list(symbols), start=start, end=end, group_by="ticker", progress=False, threads=True)
+        tickers = set(df.columns.get_level_values(0)) if isinstance(df.columns, pd.MultiIndex) else set()
+        return {symbol: df[symbol].dropna(how="all") if symbol in tickers else None for symbol in symbols}
+
+
+class FixtureSource(PriceSource):
+    """Bars from local files, <SYMBOL>.csv or <SYMBOL>.parquet in `directory`, or from a
+    {symbol: DataFrame} dict; for tests and offline use, no network needed."""
+
+    name = "fixtures"
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+        self.calls = []  # (symbol, start, end) of every fetch, so tests can check what was requested
+
+    def fetch(self, symbol, start, end):
+        self.calls.append((symbol, start, end))
+        if isinstance(self.fixtures, dict):
+            df = self.fixtures.get(symbol)
+        else:
+            directory = Path(self.fixtures)
+            if (directory / f"{symbol}.parquet").exists():
+                df = pd.read_parquet(directory / f"{symbol}.parquet")
+            elif (directory / f"{symbol}.csv").exists():
+                df = pd.read_csv(directory / f"{symbol}.csv", index_col=0, parse_dates=True)
+            else:
+                df = None
+        df = normalize(df)
+        return df[(df.index >= start) & (df.index < end)]
+
+
+# --- Date Ranges ---
+def to_date(value):
+    timestamp = pd.Timestamp(value)
+    return (timestamp.tz_localize(None) if timestamp.tz is not None else timestamp).normalize()
+
+
+def merge_ranges(ranges):
+    """Sorted, non-overlapping [start, end) ranges covering the same dates as `ranges`."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def gaps(ranges, start, end):
+    """Parts of [start, end) not covered by the merged `ranges`."""
+    missing = []
+    cursor = start
+    for range_start, range_end in ranges:
+        if range_end <= cursor:
+            continue
+        if range_start >= end:
+            break
+        if range_start > cursor:
+            missing.append((cursor, min(range_start, end)))
+        cursor = max(cursor, range_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        missing.append((cursor, end))
+    return missing
+
+
+# --- Store ---
+class PriceStore:
+    """Daily OHLCV bars kept on disk as one Parquet file per symbol.
+
+    Each file records, in its Parquet metadata, the [start, end) date ranges
+    already fetched, so get() asks the source only for the gaps of a request
+    (weekends and holidays included, once seen) and merges them in. Files
+    are rewritten atomically. Loaded symbols stay in memory as sorted frames,
+    and get() returns positional slices of them, which pandas' copy-on-write
+    hands out without copying.
+
+    Bars for today are still moving, so coverage never extends past
+    yesterday and a request reaching today always refetches it.
+    """
+
+    def __init__(self, source, directory=STORE_DIR):
+        self.source = source
+        self.directory = Path(directory) / source.name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._frames = {}  # symbol -> (mtime, frame, ranges)
+        self._lock = threading.Lock()
+
+    def _path(self, symbol):
+        return self.directory / f"{symbol.replace('/', '_')}.parquet"
+
+    def _load(self, symbol):
+        import pyarrow.parquet as pq
+
+        path = self._path(symbol)
+        if not path.exists():
+            return normalize(None), []
+        mtime = path.stat().st_mtime_ns
+        cached = self._frames.get(symbol)
+        if cached is not None and cached[0] == mtime:
+            return cached[1], cached[2]
+        table = pq.read_table(path, memory_map=True)
+        ranges = json.loads((table.schema.metadata or {}).get(RANGES_KEY, b"[]"))
+        ranges = [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in ranges]
+        frame = table.to_pandas()
+        self._frames[symbol] = (mtime, frame, ranges)
+        return frame, ranges
+
+    def _save(self, symbol, frame, ranges):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(frame)
+        metadata = {**(table.schema.metadata or {}),
+                    RANGES_KEY: json.dumps([[start.isoformat(), end.isoformat()] for start, end in ranges]).encode()}
+        path = self._path(symbol)
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        os.replace(tmp_path, path)  # atomic, so concurrent sessions never read a half-written file
+        self._frames[symbol] = (path.stat().st_mtime_ns, frame, ranges)
+
+    def ranges(self, symbol):
+        """The [start, end) date ranges held for `symbol`."""
+        return self._load(symbol)[1]
+
+    def get(self, symbol, start, end):
+        """Bars of `symbol` for start <= date < end, fetching only the dates not held yet."""
+        return self.get_many([symbol], start, end)[symbol]
+
+    def get_many(self, symbols, start, end, batch_size=BATCH_SYMBOLS, max_workers=FETCH_WORKERS):
+        """{symbol: bars for start <= date < end}, fetching the missing dates of all symbols in batches.
+
+        Symbols missing the same dates share a request of up to `batch_size`
+        symbols, and the batches run concurrently on `max_workers` threads.
+        """
+        start, end = to_date(start), to_date(end)
+        with self._lock:
+            held = {symbol: self._load(symbol)[1] for symbol in symbols}
+        wanted = {}  # gap -> symbols missing it
+        for symbol, ranges in held.items():
+            for gap in gaps(ranges, start, end):
+                wanted.setdefault(gap, []).append(symbol)
+        jobs = [(gap, batch) for gap, missing in wanted.items()
+                for batch in (missing[i:i + batch_size] for i in range(0, len(missing), batch_size))]
+
+        fetched = {}  # symbol -> [(gap, rows)]
+        if jobs:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as pool:
+                answers = pool.map(lambda job: self.source.fetch_many(job[1], *job[0]), jobs)
+                for (gap, batch), answer in zip(jobs, answers):
+                    for symbol in batch:
+                        fetched.setdefault(symbol, []).append((gap, answer.get(symbol)))
+
+        result = {}
+        with self._lock:
+            for symbol in symbols:
+                frame = self._merge(symbol, fetched[symbol]) if symbol in fetched else self._load(symbol)[0]
+                first, last = frame.index.searchsorted(start), frame.index.searchsorted(end)
+                result[symbol] = frame.iloc[first:last]
+        return result
+
+    def _merge(self, symbol, fetched):
+        """Merge [((gap_start, gap_end), rows)] into the stored bars of `symbol` and record the covered gaps."""
+        frame, ranges = self._load(symbol)  # reloaded: another session may have written meanwhile
+        today = pd.Timestamp(datetime.date.today())
+        parts = [frame]
+        for (gap_start, gap_end), rows in fetched:
+            rows = normalize(rows)
+            rows = rows[(rows.index >= gap_start) & (rows.index < gap_end)]
+            parts.append(rows)
+            if not rows.empty or np.busday_count(gap_start.date(), gap_end.date()) <= MAX_EMPTY_BUSINESS_DAYS:
+                if min(gap_end, today) > gap_start:
+                    ranges = ranges + [(gap_start, min(gap_end, today))]
+        frame = pd.concat([part for part in parts if not part.empty] or [frame])
+        frame = frame[~frame.index.duplicated(keep="last")].sort_index()
+        ranges = merge_ranges(ranges)
+        self._save(symbol, frame, ranges)
+        return frame
+
+
+@functools.lru_cache(maxsize=1)
+def default_store():
+    """The shared store: Yahoo Finance, or local fixture files when BASE_PRICE_FIXTURES is set."""
+    return PriceStore(FixtureSource(FIXTURES_DIR) if FIXTURES_DIR else YahooSource())
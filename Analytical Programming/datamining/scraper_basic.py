@@ -1,85 +1,107 @@
 import streamlit as st
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
-from io import BytesIO
+from urllib.parse import urlsplit
+
+from export import FORMATS, new_bundle
+from fetcher import fetch_pages, read_sitemap
+from http_cache import HTML_TTL, default_cache, get_html
+from tables import extract_tables
+
+
+# In-memory tier in front of the shared disk cache (see http_cache.py)
+@st.cache_data(ttl=HTML_TTL, show_spinner=False)
+def fetch_html(url):
+    return get_html(url)
+
 
 st.title("Web Scraper: Extract Tables from Websites")
 
-# Input URL
-url = st.text_input("Enter the URL of the website to scrape:")
+mode = st.radio("Mode", ["Single URL", "Batch (URL list or sitemap)"], horizontal=True)
+export_format = FORMATS[st.selectbox("Export format", list(FORMATS))]
+
+
+if mode == "Single URL":
+    # Input URL
+    url = st.text_input("Enter the URL of the website to scrape:")
+
+    if st.button("Scrape Data"):
+        if url:
+            try:
+                # Fetch the webpage (served from the cache while fresh)
+                html = fetch_html(url)
+
+                # Find tables on the page
+                all_dfs = extract_tables(html)
+
+                if not all_dfs:
+                    st.warning("No tables found on this webpage. Try another URL.")
+                else:
+                    bundle = new_bundle(st.session_state, "scraped_data", export_format)
+                    for i, df in enumerate(all_dfs):
+                        # Display table
+                        st.write(f"Table {i+1}")
+                        st.dataframe(df)
+                        bundle.add(f"table_{i+1}", df)
 
-if st.button("Scrape Data"):
-    if url:
+                    bundle.download_button()
+            except requests.exceptions.RequestException as e:
+                st.error(f"Error fetching the webpage: {e}")
+            except Exception as e:
+                st.error(f"An unexpected error occurred: {e}")
+        else:
+            st.warning("Please enter a valid URL.")
+
+else:
+    # Pages come from a pasted list or a sitemap and are fetched concurrently,
+    # a few at a time per host, with retries and robots.txt checks (see fetcher.py)
+    url_list = st.text_area("URLs to scrape (one per line):")
+    sitemap_url = st.text_input("...or a sitemap URL:")
+    col1, col2, col3 = st.columns(3)
+    per_host = col1.number_input("Concurrent requests per host", min_value=1, max_value=32, value=4)
+    rate = col2.number_input("Requests per second per host (0 = no limit)", min_value=0.0, value=2.0, step=0.5)
+    retries = col3.number_input("Retries", min_value=0, max_value=10, value=3)
+    respect_robots = st.checkbox("Respect robots.txt", value=True)
+    use_cache = st.checkbox("Use cached pages", value=True)
+
+    if st.button("Scrape Data"):
+        options = dict(per_host_concurrency=int(per_host), per_host_rate=rate or None, retries=int(retries),
+                       respect_robots=respect_robots, cache=default_cache() if use_cache else None)
         try:
-            # Fetch the webpage
-            response = requests.get(url, headers={"User-Agent": "Mozilla/5.0"})
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, "html.parser")
-            
-            # Find tables on the page
-            tables = soup.find_all("table")
-            
-            if not tables:
-                st.warning("No tables found on this webpage. Try another URL.")
+            urls = [line.strip() for line in url_list.splitlines() if line.strip()]
+            if sitemap_url:
+                urls += read_sitemap(sitemap_url, **options)
+
+            if not urls:
+                st.warning("Please enter at least one URL or a sitemap.")
             else:
-                all_dfs = []
-
-                for i, table in enumerate(tables):
-                    headers = [header.text.strip() for header in table.find_all("th")]
-                    
-                    # Extract all rows
-                    rows = []
-                    max_cols = len(headers) if headers else 0  # Default to header column count
-                    
-                    for row in table.find_all("tr"):
-                        cells = [cell.text.strip() for cell in row.find_all("td")]
-                        max_cols = max(max_cols, len(cells))  # Ensure column count is consistent
-                        if cells:
-                            rows.append(cells)
-
-                    # Ensure all rows have the same number of columns
-                    for row in rows:
-                        while len(row) < max_cols:
-                            row.append("")  # Pad missing columns with empty values
-
-                    # Handle duplicate column names
-                    if headers:
-                        unique_headers = []
-                        seen = {}
-                        for col in headers:
-                            if col in seen:
-                                seen[col] += 1
-                                unique_headers.append(f"{col}_{seen[col]}")
-                            else:
-                                seen[col] = 0
-                                unique_headers.append(col)
-                    else:
-                        unique_headers = [f"Column {i+1}" for i in range(max_cols)]
-
-                    # Create DataFrame with unique column names
-                    df = pd.DataFrame(rows, columns=unique_headers)
-                    all_dfs.append(df)
-
-                    # Display table
-                    st.write(f"Table {i+1}")
-                    st.dataframe(df)
-                
-                # Combine all tables into one CSV
-                csv_buffer = BytesIO()
-                combined_df = pd.concat(all_dfs, ignore_index=True)
-                combined_df.to_csv(csv_buffer, index=False)
-                csv_buffer.seek(0)
-
-                st.download_button(
-                    label="Download Data as CSV",
-                    data=csv_buffer,
-                    file_name="scraped_data.csv",
-                    mime="text/csv"
-                )
-        except requests.exceptions.RequestException as e:
-            st.error(f"Error fetching the webpage: {e}")
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+
+                def report(done, total):
+                    progress_bar.progress(done / total)
+                    status_text.text(f"Fetched {done}/{total} pages")
+
+                # Tables go to disk as each page is parsed instead of being kept for a final concat
+                bundle = new_bundle(st.session_state, "scraped_data", export_format)
+                summary = []
+
+                def save_tables(result):
+                    tables = extract_tables(result["text"]) if result["error"] is None else []
+                    summary.append({"URL": result["url"], "Status": result["status"],
+                                    "Tables": len(tables), "Error": result["error"]})
+                    page = urlsplit(result["url"])
+                    for i, df in enumerate(tables):
+                        bundle.add(f"{page.netloc}{page.path}_table_{i+1}", df)
+
+                fetch_pages(urls, progress=report, on_page=save_tables, **options)
+
+                st.write("### Pages")
+                st.dataframe(pd.DataFrame(summary))
+
+                if not bundle.files:
+                    st.warning("No tables found on these pages.")
+                else:
+                    bundle.download_button()
         except Exception as e:
             st.error(f"An unexpected error occurred: {e}")
-    else:
-        st.warning("Please enter a valid URL.")
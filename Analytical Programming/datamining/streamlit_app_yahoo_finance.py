@@ -1,6 +1,15 @@
 import streamlit as st
-import yfinance as yf
-import matplotlib.pyplot as plt
+
+from charts import BACKENDS, METHODS, line_figure, webgl_available, webgl_figure
+from price_store import LIVE_PRICE_TTL, default_store
+
+
+# Served from the local price store, which only downloads dates it does not hold yet (see price_store.py);
+# the memory tier keeps today's still-moving bar from being refetched on every click
+@st.cache_data(ttl=LIVE_PRICE_TTL, show_spinner=False)
+def load_prices(symbol, start, end):
+    return default_store().get(symbol, start, end)
+
 
 # Dictionary of stock symbols
 STOCKS = {
@@ -19,27 +28,29 @@ selected_stock = st.selectbox("Choose a stock:", list(STOCKS.keys()))
 start_date = st.date_input("Start Date")
 end_date = st.date_input("End Date")
 
+# Long histories are decimated to the chart's width before drawing (see charts.py)
+col1, col2 = st.columns(2)
+backend = col1.radio("Chart", BACKENDS, horizontal=True)
+method = col2.selectbox("Downsampling", METHODS)
+if backend == BACKENDS[1] and not webgl_available():
+    st.warning("Interactive charts need plotly (pip install plotly); showing static charts.")
+
 # Fetch data button
 if st.button("Fetch Data"):
     if start_date and end_date:
         stock_symbol = STOCKS[selected_stock]
 
         # Download stock data
-        df = yf.download(stock_symbol, start=start_date, end=end_date)
+        df = load_prices(stock_symbol, start_date, end_date)
 
         if df.empty:
             st.warning("No data available for the selected date range. Try another period.")
         else:
             # Plot the time series data
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.plot(df.index, df["Close"], label="Closing Price", color="blue")
-            ax.set_title(f"{selected_stock} Stock Prices")
-            ax.set_xlabel("Date")
-            ax.set_ylabel("Price (USD)")
-            ax.legend()
-            ax.grid()
-
-            # Display plot
-            st.pyplot(fig)
+            panels = [("Price (USD)", [("Closing Price", df["Close"], "blue")])]
+            if backend == BACKENDS[1] and webgl_available():
+                st.plotly_chart(webgl_figure(panels, f"{selected_stock} Stock Prices", method))
+            else:
+                st.pyplot(line_figure(panels, f"{selected_stock} Stock Prices", method))
     else:
         st.warning("Please select a valid start and end date.")
@@ -0,0 +1,211 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+
+# --- Constants ---
+MAX_SPAN = 1000  # browsers clamp colspan/rowspan; so do we, to bound the grid
+NUMBER_JUNK = r"[,\s$€£¥]"  # thousands separators and currency symbols stripped before numeric parsing
+HEADER_JOIN = " / "  # joins the labels of stacked header rows
+CELL_TAGS = ("td", "th")
+DATE_SAMPLE = 20  # values tried as dates before parsing a whole column
+INT64_LIMIT = 2.0 ** 63  # whole numbers at or beyond this magnitude do not fit an Int64 column
+
+
+def unique_headers(headers):
+    """Suffix repeated column names with _1, _2, ... so every column is addressable."""
+    unique = []
+    seen = {}
+    for col in headers:
+        if col in seen:
+            seen[col] += 1
+            unique.append(f"{col}_{seen[col]}")
+        else:
+            seen[col] = 0
+            unique.append(col)
+    return unique
+
+
+def extract_tables(html, engine="lxml"):
+    """Every <table> in an HTML document as a DataFrame.
+
+    The default lxml engine resolves colspan/rowspan, takes column names from
+    <thead> (or leading all-<th> rows) and infers numeric and date dtypes.
+    engine="html.parser" is the original BeautifulSoup extractor, which keeps
+    every cell as a string and ignores spans.
+    """
+    if engine == "lxml":
+        return _extract_lxml(html)
+    return _extract_bs4(html)
+
+
+# --- lxml Engine ---
+def _span(cell, name):
+    value = cell.get(name)
+    if value is None:
+        return 1
+    try:
+        return min(max(int(value), 1), MAX_SPAN)
+    except ValueError:
+        return 1
+
+
+def _cell_text(cell):
+    if len(cell) == 0:
+        return (cell.text or "").strip()  # no child elements: skip the itertext walk
+    return "".join(cell.itertext()).strip()
+
+
+def _grid(rows):
+    """Cell texts of `rows` laid out on the table grid, with spanned cells repeated."""
+    grid = []
+    carried = {}  # column -> [rows left, text] for cells spanning down from earlier rows
+    for row in rows:
+        cells = [cell for cell in row if cell.tag in CELL_TAGS]
+        if not carried and not any(cell.get("colspan") or cell.get("rowspan") for cell in cells):
+            grid.append([_cell_text(cell) for cell in cells])  # plain row, the common case
+            continue
+        out = []
+        for cell in cells:
+            while len(out) in carried:
+                out.append(_take(carried, len(out)))
+            text = _cell_text(cell)
+            rowspan = _span(cell, "rowspan")
+            for _ in range(_span(cell, "colspan")):
+                if rowspan > 1:
+                    carried[len(out)] = [rowspan - 1, text]
+                out.append(text)
+        for col in sorted(c for c in carried if c >= len(out)):
+            out.extend([""] * (col - len(out)))
+            out.append(_take(carried, col))
+        grid.append(out)
+    return grid
+
+
+def _take(carried, col):
+    entry = carried[col]
+    entry[0] -= 1
+    if entry[0] == 0:
+        del carried[col]
+    return entry[1]
+
+
+def _header_rows(table, rows):
+    """How many leading rows are headers: the whole <thead>, else the leading rows made only of <th>."""
+    head = table.find("thead")
+    if head is not None:
+        return sum(1 for row in rows if row.getparent() is head)
+    count = 0
+    for row in rows:
+        cells = [cell.tag for cell in row if cell.tag in CELL_TAGS]
+        if not cells or any(tag != "th" for tag in cells):
+            break
+        count += 1
+    return count
+
+
+def infer_dtype(values):
+    """Typed Series for one column of cell strings: Int64/float64 or datetime when every value parses."""
+    series = pd.Series(values, dtype="string")
+    series = series.mask(series == "")
+    present = series.dropna()
+    if present.empty:
+        return series
+
+    numbers = pd.to_numeric(present.str.replace(NUMBER_JUNK, "", regex=True).str.replace("−", "-"),
+                            errors="coerce")
+    if numbers.notna().all():
+        if numbers.dtype.kind == "i":  # every value parsed as an int64, exactly
+            result = pd.Series(pd.NA, index=series.index, dtype="Int64")
+            result[present.index] = numbers
+            return result
+        # Integers beyond int64 (and overflowing exponents like 1e400) stay float64
+        floats = numbers.to_numpy(dtype="float64")
+        result = pd.Series(np.nan, index=series.index)
+        result[present.index] = floats
+        fits = np.isfinite(floats).all() and (np.abs(floats) < INT64_LIMIT).all()
+        return result.astype("Int64") if fits and (floats % 1 == 0).all() else result
+
+    # Try a sample first: per-element date parsing of a text column is slow
+    if present.str.contains(r"\d").all() and _parses_as_dates(present.iloc[:DATE_SAMPLE]) is not None:
+        dates = _parses_as_dates(present)
+        if dates is not None:
+            result = pd.Series(pd.NaT, index=series.index, dtype=dates.dtype)
+            result[present.index] = dates
+            return result
+    return series
+
+
+def _parses_as_dates(values):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)  # "could not infer format" for mixed formats
+        dates = pd.to_datetime(values, errors="coerce")
+    return dates if dates.notna().all() else None
+
+
+def _extract_lxml(html):
+    from lxml import etree
+
+    # lxml refuses str input that carries an encoding declaration (XHTML's <?xml ... encoding?>),
+    # so already decoded text is parsed as UTF-8 bytes; a raw body is passed through as it is
+    if isinstance(html, str):
+        html, parser = html.encode("utf-8"), etree.HTMLParser(encoding="utf-8")
+    else:
+        parser = etree.HTMLParser()
+    # Plain etree elements: lxml.html's element classes cost a lookup per node
+    doc = etree.fromstring(html, parser)
+    if doc is None:
+        return []
+    dfs = []
+    for table in doc.iter("table"):
+        # Rows of this table only; rows of nested tables belong to their own table
+        rows = table.xpath("./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr")
+        grid = _grid(rows)
+        num_headers = _header_rows(table, rows)
+        header_grid, body = grid[:num_headers], [row for row in grid[num_headers:] if row]
+        width = max((len(row) for row in grid), default=0)
+
+        names = []
+        for col in range(width):
+            labels = []
+            for row in header_grid:
+                label = row[col] if col < len(row) else ""
+                if label and label not in labels:
+                    labels.append(label)
+            names.append(HEADER_JOIN.join(labels) or f"Column {col + 1}")
+
+        # Column-wise straight from the grid: short rows are padded with ""
+        columns = [[row[col] if col < len(row) else "" for row in body] for col in range(width)]
+        frame = pd.DataFrame({i: infer_dtype(values) for i, values in enumerate(columns)}, index=pd.RangeIndex(len(body)))
+        frame.columns = unique_headers(names)
+        dfs.append(frame)
+    return dfs
+
+
+# --- BeautifulSoup Engine ---
+def _extract_bs4(html):
+    soup = BeautifulSoup(html, "html.parser")
+    dfs = []
+    for table in soup.find_all("table"):
+        headers = [header.text.strip() for header in table.find_all("th")]
+
+        # Extract all rows
+        rows = []
+        max_cols = len(headers) if headers else 0  # Default to header column count
+
+        for row in table.find_all("tr"):
+            cells = [cell.text.strip() for cell in row.find_all("td")]
+            max_cols = max(max_cols, len(cells))  # Ensure column count is consistent
+            if cells:
+                rows.append(cells)
+
+        # Ensure all rows have the same number of columns
+        for row in rows:
+            while len(row) < max_cols:
+                row.append("")  # Pad missing columns with empty values
+
+        # Handle duplicate column names
+        columns = unique_headers(headers) if headers else [f"Column {i+1}" for i in range(max_cols)]
+        dfs.append(pd.DataFrame(rows, columns=columns))
+    return dfs
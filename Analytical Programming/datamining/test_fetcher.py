@@ -0,0 +1,192 @@
+"""BatchFetcher against a local aiohttp server standing in for a website.
+
+Run from this directory with `python -m pytest test_fetcher.py`.
+"""
+import asyncio
+import socket
+import time
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetcher import BatchFetcher
+
+SITEMAP = '<?xml version="1.0" encoding="UTF-8"?><{tag} xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{body}</{tag}>'
+
+
+def serve(routes, check):
+    """Run `check(url)` against a server with `routes`; url(path) is the absolute URL of a path on it."""
+    async def run():
+        app = web.Application()
+        app.router.add_routes(routes)
+        async with TestServer(app) as server:
+            return await check(lambda path: str(server.make_url(path)))
+    return asyncio.run(run())
+
+
+async def fetch_all(fetcher, urls):
+    return {result["url"]: result async for result in fetcher.fetch(urls)}
+
+
+def test_per_host_concurrency():
+    in_flight, peak = [0], [0]
+
+    async def page(request):
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        await asyncio.sleep(0.05)
+        in_flight[0] -= 1
+        return web.Response(text="ok")
+
+    async def check(url):
+        fetcher = BatchFetcher(per_host_concurrency=2, respect_robots=False)
+        return await fetch_all(fetcher, [url(f"/page/{i}") for i in range(8)])
+
+    results = serve([web.get("/page/{i}", page)], check)
+    assert all(result["status"] == 200 for result in results.values())
+    assert peak[0] == 2
+
+
+def test_per_host_rate():
+    starts = []
+
+    async def page(request):
+        starts.append(time.monotonic())
+        return web.Response(text="ok")
+
+    async def check(url):
+        fetcher = BatchFetcher(per_host_concurrency=5, per_host_rate=20, respect_robots=False)
+        return await fetch_all(fetcher, [url(f"/page/{i}") for i in range(5)])
+
+    serve([web.get("/page/{i}", page)], check)
+    gaps = [later - earlier for earlier, later in zip(sorted(starts), sorted(starts)[1:])]
+    assert len(starts) == 5
+    assert min(gaps) > 0.04  # 20 requests per second: one every 50 ms
+
+
+def test_retries_honour_retry_after():
+    attempts = []
+
+    async def flaky(request):
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            return web.Response(status=503, headers={"Retry-After": "1"})
+        return web.Response(text="recovered")
+
+    async def check(url):
+        fetcher = BatchFetcher(retries=3, backoff=0.01, respect_robots=False)
+        return await fetch_all(fetcher, [url("/flaky")])
+
+    (result,) = serve([web.get("/flaky", flaky)], check).values()
+    assert (result["status"], result["text"], result["error"]) == (200, "recovered", None)
+    assert len(attempts) == 2
+    assert attempts[1] - attempts[0] >= 1.0  # waited for Retry-After, not the 10-20 ms backoff
+
+
+def test_retries_back_off_then_give_up():
+    attempts = []
+
+    async def broken(request):
+        attempts.append(time.monotonic())
+        return web.Response(status=500)
+
+    async def check(url):
+        fetcher = BatchFetcher(retries=2, backoff=0.05, respect_robots=False)
+        return await fetch_all(fetcher, [url("/broken")])
+
+    (result,) = serve([web.get("/broken", broken)], check).values()
+    assert (result["status"], result["error"]) == (500, "HTTP 500")
+    assert len(attempts) == 3
+    first, second = attempts[1] - attempts[0], attempts[2] - attempts[1]
+    assert 0.05 <= first < 0.2 and 0.1 <= second < 0.4  # backoff * 2 ** attempt * (1 + jitter in [0, 1))
+
+
+def test_robots_disallow():
+    requested = []
+
+    async def robots(request):
+        return web.Response(text="User-agent: *\nDisallow: /private/\n")
+
+    async def page(request):
+        requested.append(request.path)
+        return web.Response(text="ok")
+
+    async def check(url):
+        return await fetch_all(BatchFetcher(), [url("/public/a"), url("/private/b")])
+
+    results = serve([web.get("/robots.txt", robots), web.get("/{section}/{name}", page)], check)
+    by_path = {url.rsplit("/", 2)[-2]: result for url, result in results.items()}
+    assert by_path["public"]["status"] == 200
+    assert by_path["private"]["error"] == "Disallowed by robots.txt"
+    assert requested == ["/public/a"]
+
+
+def test_robots_forbidden_disallows_everything():
+    requested = []
+
+    async def robots(request):
+        return web.Response(status=403)
+
+    async def page(request):
+        requested.append(request.path)
+        return web.Response(text="ok")
+
+    async def check(url):
+        return await fetch_all(BatchFetcher(), [url("/a"), url("/b")])
+
+    results = serve([web.get("/robots.txt", robots), web.get("/{name}", page)], check)
+    assert all(result["error"] == "Disallowed by robots.txt" for result in results.values())
+    assert requested == []
+
+
+def test_robots_unreachable_disallows_everything():
+    requested = []
+
+    async def robots(request):
+        return web.Response(status=503)
+
+    async def page(request):
+        requested.append(request.path)
+        return web.Response(text="ok")
+
+    async def check(url):
+        with socket.socket() as closed:  # a port nothing listens on once the socket is closed
+            closed.bind(("127.0.0.1", 0))
+            unreachable = f"http://127.0.0.1:{closed.getsockname()[1]}/a"
+        fetcher = BatchFetcher(retries=1, backoff=0.01)
+        return [*(await fetch_all(fetcher, [url("/a"), url("/b"), unreachable])).values()]
+
+    results = serve([web.get("/robots.txt", robots), web.get("/{name}", page)], check)
+    assert all(result["error"] == "Disallowed by robots.txt" for result in results)
+    assert requested == []
+
+
+def test_robots_missing_allows_everything():
+    async def page(request):
+        return web.Response(text="ok")
+
+    async def check(url):
+        return await fetch_all(BatchFetcher(), [url("/a"), url("/b")])
+
+    results = serve([web.get("/{name}", page)], check)  # /robots.txt matches too, so serve a 404 for it
+    assert all(result["status"] == 200 for result in results.values())
+
+
+def test_sitemap_index_expansion():
+    children = {"/news.xml": ["/news/1"], "/docs.xml": ["/docs/0", "/docs/1"]}
+
+    async def document(request):
+        base = f"{request.scheme}://{request.host}"
+        if request.path == "/sitemap.xml":  # an index listing one child twice
+            tag, body = "sitemapindex", "".join(f"<sitemap><loc>{base}{path}</loc></sitemap>"
+                                                for path in ["/news.xml", "/docs.xml", "/news.xml"])
+        else:
+            tag, body = "urlset", "".join(f"<url><loc> {base}{path} </loc></url>" for path in children[request.path])
+        return web.Response(text=SITEMAP.format(tag=tag, body=body), content_type="application/xml")
+
+    async def check(url):
+        pages = [url(path) for paths in children.values() for path in paths]
+        return await BatchFetcher().sitemap_urls(url("/sitemap.xml")), pages
+
+    urls, pages = serve([web.get(path, document) for path in ["/sitemap.xml", *children]], check)
+    assert sorted(urls) == sorted(pages)
@@ -0,0 +1,116 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from indicators import compute, ffill
+from price_store import COLUMNS
+
+# --- Constants ---
+SYMBOL_COLUMNS = ("Symbol", "Ticker", "symbol", "ticker")  # universe CSV column names, first match wins
+MOVER_PERIODS = {"1 day": 1, "1 week": 5, "1 month": 21, "3 months": 63, "1 year": 252}  # trading days
+CORRELATION_WINDOW = 63  # trading days in a rolling correlation
+SNAPSHOT_INDICATORS = ["RSI", "MACD Histogram", "ATR", "Volatility", "Drawdown"]  # latest values per symbol
+
+
+def parse_symbols(text):
+    """Unique upper-case tickers from text separated by commas, semicolons or whitespace, in order."""
+    return list(dict.fromkeys(symbol.upper() for symbol in re.split(r"[,;\s]+", text) if symbol))
+
+
+def read_universe(file):
+    """Tickers from a universe CSV: its Symbol/Ticker column, else its first column."""
+    df = pd.read_csv(file)
+    column = next((name for name in SYMBOL_COLUMNS if name in df.columns), df.columns[0])
+    return parse_symbols(" ".join(df[column].dropna().astype(str)))
+
+
+# --- Aligned Frames ---
+def long_frame(frames):
+    """One row per (Date, Symbol) with the OHLCV columns, from {symbol: bars}."""
+    present = {symbol: df for symbol, df in frames.items() if not df.empty}
+    if not present:
+        return pd.DataFrame(columns=["Date", "Symbol", *COLUMNS])
+    df = pd.concat(present, names=["Symbol", "Date"]).reset_index()
+    df["Symbol"] = df["Symbol"].astype("category")
+    return df[["Date", "Symbol", *COLUMNS]]
+
+
+def wide_frame(frames, field="Close"):
+    """Date x symbol frame of one field, aligned on the union of all trading dates (NaN where a symbol has no bar)."""
+    present = {symbol: df[field] for symbol, df in frames.items() if not df.empty}
+    return pd.DataFrame(present).sort_index() if present else pd.DataFrame()
+
+
+# --- Cross-Sectional Views ---
+def returns_matrix(close):
+    """Daily simple returns, date x symbol; a missing bar gives NaN instead of a return across the gap."""
+    values = close.to_numpy()
+    returns = np.full(values.shape, np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1
+    return pd.DataFrame(returns, index=close.index, columns=close.columns)
+
+
+def correlation_matrix(returns, window=CORRELATION_WINDOW):
+    """Pairwise correlation of the last `window` daily returns (pairs need half the window in common)."""
+    return returns.iloc[-window:].corr(min_periods=max(window // 2, 2))
+
+
+def rolling_correlation(returns, window=CORRELATION_WINDOW, benchmark=None):
+    """Rolling `window`-day correlation of every symbol with `benchmark` (default: the equal-weight
+    universe average), computed for all symbols at once from rolling sums."""
+    if benchmark is None:
+        benchmark = returns.mean(axis=1)
+    x = returns.to_numpy()
+    y = np.broadcast_to(benchmark.to_numpy()[:, None], x.shape)
+    valid = ~np.isnan(x) & ~np.isnan(y)
+    x, y = np.where(valid, x, 0.0), np.where(valid, y, 0.0)
+
+    def rolling_sum(values):
+        sums = np.cumsum(values, axis=0)
+        sums[window:] = sums[window:] - sums[:-window]
+        return sums
+
+    n = rolling_sum(valid.astype(float))
+    sx, sy, sxx, syy, sxy = (rolling_sum(v) for v in (x, y, x * x, y * y, x * y))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = sxy - sx * sy / n
+        var_x, var_y = sxx - sx * sx / n, syy - sy * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < window // 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    return pd.DataFrame(np.clip(corr, -1, 1), index=returns.index, columns=returns.columns)
+
+
+def period_returns(close, periods=MOVER_PERIODS):
+    """Return of every symbol over each lookback, from its last close; symbol x period."""
+    values = close.ffill().to_numpy()
+    if not len(values):
+        return pd.DataFrame(index=close.columns)
+    last = values[-1]
+    result = {}
+    for name, days in periods.items():
+        if days < len(values):
+            result[name] = last / values[-1 - days] - 1
+    return pd.DataFrame(result, index=close.columns)
+
+
+def top_movers(returns, n=10):
+    """(gainers, losers): the `n` symbols with the highest and the lowest of one column of period_returns()."""
+    ranked = returns.dropna().sort_values(ascending=False)
+    return ranked.head(n).to_frame("Return"), ranked.tail(n).iloc[::-1].to_frame("Return")
+
+
+def indicator_snapshot(frames):
+    """Latest value of each SNAPSHOT_INDICATORS output per symbol, plus its deepest drawdown; symbol x indicator.
+
+    Every indicator is computed for the whole universe at once on the aligned symbol x date arrays.
+    """
+    fields = {field: wide_frame(frames, field) for field in ("High", "Low", "Close")}
+    symbols = fields["Close"].columns
+    if fields["Close"].empty:
+        return pd.DataFrame(columns=[*SNAPSHOT_INDICATORS, "Max Drawdown"])
+    values = compute({field: frame.to_numpy().T for field, frame in fields.items()},
+                     sorted({name.split()[0] for name in SNAPSHOT_INDICATORS}))
+    snapshot = pd.DataFrame({name: ffill(values[name])[:, -1] for name in SNAPSHOT_INDICATORS}, index=symbols)
+    snapshot["Max Drawdown"] = np.nanmin(values["Drawdown"], axis=1)
+    return snapshot
@@ -0,0 +1,73 @@
+import functools
+import uuid
+from pathlib import Path
+
+import numpy as np
+import streamlit as st
+
+from state import UNCLAIMED_COLOR
+
+# --- Constants ---
+VIEW_STATE = {
+    "latitude": -26.2,
+    "longitude": 28.2,
+    "zoom": 8.5,
+    "pitch": 0,
+}
+COORD_DECIMALS = 5  # ~1 m; float32 digits beyond that only make the first frame bigger
+COMPONENT_DIR = Path(__file__).with_name("map_component")  # deck.gl frontend, see index.html
+
+
+@functools.lru_cache(maxsize=1)
+def map_component():
+    import streamlit.components.v1 as components
+
+    return components.declare_component("territory_map", path=str(COMPONENT_DIR))
+
+
+class MapRenderer:
+    """Draws the territories with a deck.gl component that stays mounted across reruns.
+
+    The browser gets every position, name and owner once per simulation. After
+    that each draw() sends only the territories that changed owner since the
+    previous frame, as (index, palette code) pairs written into the layer's
+    colour buffer in place, so a frame costs time and bytes proportional to
+    the ownership changes rather than to the number of territories.
+
+    Frames are numbered. A component that cannot apply a frame - it was
+    remounted by a page reload, or missed one - asks for the full map again
+    by setting its value, and the next draw() sends it.
+    """
+
+    def __init__(self, state, agent_colors, agent_names):
+        self.state = state
+        self.palette = [list(UNCLAIMED_COLOR)] + [list(c) for c in agent_colors]
+        self.labels = ["Unclaimed"] + list(agent_names)
+        self.map_id = uuid.uuid4().hex  # a new simulation replaces whatever map the component holds
+        self.frame = 0
+        self.request = None  # the component's last request for the full map
+        state.track_changes()
+
+    def full_map(self):
+        owner = self.state.owner.astype(np.intp) + 1  # palette code: 0 is unclaimed
+        return {
+            "lon": self.state.lon.astype(np.float64).round(COORD_DECIMALS).tolist(),
+            "lat": self.state.lat.astype(np.float64).round(COORD_DECIMALS).tolist(),
+            "owner": owner.tolist(),
+            "names": self.state.names.tolist(),
+            "palette": self.palette,
+            "labels": self.labels,
+            "view": VIEW_STATE,
+        }
+
+    def draw(self, key="territory_map"):
+        """Send this frame to the browser; returns how many territories changed owner since the last one."""
+        changed = self.state.drain_dirty()
+        request = st.session_state.get(key)
+        full = self.frame == 0 or (request is not None and request != self.request)
+        self.request = request
+        self.frame += 1
+        changes = [] if full else np.column_stack([changed, self.state.owner[changed].astype(np.intp) + 1]).ravel().tolist()
+        map_component()(map_id=self.map_id, frame=self.frame, full=self.full_map() if full else None,
+                        changes=changes, key=key, default=None)
+        return len(changed)
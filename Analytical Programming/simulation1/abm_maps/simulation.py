@@ -0,0 +1,212 @@
+import argparse
+import colorsys
+import importlib
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from spatial import SpatialIndex, knn_adjacency
+from state import UNCLAIMED, TerritoryState
+from strategies import STRATEGIES
+
+# --- Constants ---
+DEFAULT_STRATEGIES = ["greedy", "random", "aggressive"]
+BASE_COLORS = [[255, 0, 0], [0, 0, 255], [0, 255, 0]]  # RGB for the first three agents
+GAUTENG_BOUNDS = {
+    'lat_min': -26.7,
+    'lat_max': -25.5,
+    'lon_min': 27.5,
+    'lon_max': 28.7
+}
+
+
+# --- Generate Random Territory Points in Gauteng ---
+def generate_gauteng_territories(n, rng, num_agents):
+    lats = rng.uniform(low=GAUTENG_BOUNDS['lat_min'], high=GAUTENG_BOUNDS['lat_max'], size=n)
+    lons = rng.uniform(low=GAUTENG_BOUNDS['lon_min'], high=GAUTENG_BOUNDS['lon_max'], size=n)
+    return TerritoryState(lats, lons, num_agents=num_agents)
+
+
+def agent_roster(strategies, agents_per_strategy=1):
+    """Names, RGB colours and strategy names of every agent, in agent-code order."""
+    kinds = [name for name in strategies for _ in range(agents_per_strategy)]
+    n = len(kinds)
+    names = [f"Agent {chr(ord('A') + i)}" if n <= 26 else f"Agent {i+1}" for i in range(n)]
+    colors = []
+    for i in range(n):
+        if i < len(BASE_COLORS):
+            colors.append(BASE_COLORS[i])
+        else:
+            # golden-ratio hue steps keep neighbouring agent codes visually distinct
+            r, g, b = colorsys.hsv_to_rgb((i * 0.618034) % 1.0, 0.85, 0.95)
+            colors.append([int(r * 255), int(g * 255), int(b * 255)])
+    return names, colors, kinds
+
+
+# --- Simulation Model ---
+class TerritorySimulation:
+    """N-agent territory model with pluggable strategies and no Streamlit dependency.
+
+    `strategies` names entries of strategies.STRATEGIES (one agent each, times
+    `agents_per_strategy`). With `k` set, each territory is adjacent to its k
+    nearest neighbours; with `k=None` every other territory is adjacent, as in
+    the original three-agent model. All randomness comes from one
+    `numpy.random.Generator`, so a seed (or a spawned `SeedSequence`)
+    reproduces a run exactly.
+    """
+
+    def __init__(self, num_territories, strategies=DEFAULT_STRATEGIES, agents_per_strategy=1, k=None, seed=None):
+        unknown = [name for name in strategies if name not in STRATEGIES]
+        if unknown:
+            raise ValueError(f"Unknown strategies {unknown}; registered: {sorted(STRATEGIES)}")
+        self.num_territories = num_territories
+        self.agent_names, self.agent_colors, self.agent_strategies = agent_roster(strategies, agents_per_strategy)
+        if len(self.agent_names) > num_territories:
+            raise ValueError(f"{len(self.agent_names)} agents need at least as many territories")
+        self.policies = [STRATEGIES[name] for name in self.agent_strategies]
+        self.k = k or None
+        self.rng = np.random.default_rng(seed)
+        self.reset()
+
+    def choice(self, options):
+        return int(options[self.rng.integers(len(options))])
+
+    def _any_other(self, current_idx):
+        # uniform over every territory except current_idx, without building the list
+        i = int(self.rng.integers(self.num_territories - 1))
+        return i + (i >= current_idx)
+
+    def reset(self):
+        n = self.num_territories
+        num_agents = len(self.agent_names)
+        self.territories = generate_gauteng_territories(n, self.rng, num_agents)
+        self.location = self.rng.choice(n, size=num_agents, replace=False).astype(np.intp)
+        self.cooldown = np.zeros(num_agents, dtype=np.int32)
+        self.spatial_index = SpatialIndex(self.territories.lat, self.territories.lon)
+        self.neighbours = knn_adjacency(self.territories.lat, self.territories.lon, self.k) if self.k else None
+        self.step_count = 0
+
+    def step(self):
+        active = np.flatnonzero(self.cooldown == 0)
+        self.cooldown[self.cooldown > 0] -= 1
+
+        targets = np.empty(len(active), dtype=np.intp)
+        for j, code in enumerate(active.tolist()):
+            current_idx = int(self.location[code])
+            neighbours = self.neighbours[current_idx] if self.neighbours is not None else None
+            target_idx = self.policies[code](self, code, current_idx, neighbours)
+            if target_idx is None:
+                target_idx = self.choice(neighbours) if neighbours is not None else self._any_other(current_idx)
+            targets[j] = target_idx
+
+        self._resolve_contention(active, targets)
+        self.step_count += 1
+
+    def _resolve_contention(self, movers, targets):
+        """Give every targeted territory to one uniformly random contender, in one batch."""
+        if len(movers) == 0:
+            return
+        # sort by target with a random tie-break; the first row of each target wins
+        order = np.lexsort((self.rng.random(len(targets)), targets))
+        targets, movers = targets[order], movers[order]
+        first = np.ones(len(targets), dtype=bool)
+        first[1:] = targets[1:] != targets[:-1]
+        won, winners = targets[first], movers[first]
+
+        previous = self.territories.set_owners(won, winners)
+        for idx in won.tolist():
+            self.spatial_index.claim(idx)
+        self.location[winners] = won
+        # taking a territory from another agent costs the winner its next move
+        self.cooldown[winners[(previous != UNCLAIMED) & (previous != winners)]] = 1
+
+    def ownership(self):
+        return dict(zip(self.agent_names, self.territories.owned_counts.tolist()))
+
+
+# --- Headless Batch Runner ---
+def run_replication(replication, seed, num_territories, steps, strategies=DEFAULT_STRATEGIES,
+                    agents_per_strategy=1, k=None, plugins=()):
+    """Run one replication and return its ownership time series in long format."""
+    for module in plugins:
+        importlib.import_module(module)  # registers custom strategies in this worker
+    sim = TerritorySimulation(num_territories, strategies, agents_per_strategy, k, seed=seed)
+    num_agents = len(sim.agent_names)
+    counts = np.zeros((steps + 1, num_agents), dtype=np.int32)
+    counts[0] = sim.territories.owned_counts
+    for t in range(1, steps + 1):
+        sim.step()
+        counts[t] = sim.territories.owned_counts
+
+    return pd.DataFrame({
+        'replication': np.int32(replication),
+        'step': np.repeat(np.arange(steps + 1, dtype=np.int32), num_agents),
+        'agent': pd.Categorical(np.tile(sim.agent_names, steps + 1), categories=sim.agent_names),
+        'strategy': pd.Categorical(np.tile(sim.agent_strategies, steps + 1)),
+        'territories': counts.ravel(),
+    })
+
+
+def run_batch(replications, steps, num_territories, out_path, seed=None, workers=None, **model_kwargs):
+    """Run replications across a process pool and stream the results to one Parquet file.
+
+    Each replication gets its own child of `SeedSequence(seed)`, so the batch is
+    reproducible regardless of worker count or completion order. `model_kwargs`
+    are passed through to run_replication (strategies, agents_per_strategy, k, plugins).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    seeds = np.random.SeedSequence(seed).spawn(replications)
+    writer = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(run_replication, r, seeds[r], num_territories, steps, **model_kwargs)
+                for r in range(replications)
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                table = pa.Table.from_pandas(future.result(), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table)
+                print(f"\r{done}/{replications} replications", end="", flush=True)
+    finally:
+        if writer is not None:
+            writer.close()
+    print()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Gauteng territory simulation headless.")
+    parser.add_argument("--replications", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=100)
+    parser.add_argument("--territories", type=int, default=500)
+    parser.add_argument("--strategies", nargs="+", default=DEFAULT_STRATEGIES,
+                        help="registered strategy names, one agent each")
+    parser.add_argument("--agents-per-strategy", type=int, default=1)
+    parser.add_argument("--k", type=int, default=0,
+                        help="nearest neighbours per territory (0 = every territory is adjacent)")
+    parser.add_argument("--plugin", action="append", default=[],
+                        help="module to import that registers extra strategies (repeatable)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="ownership.parquet")
+    args = parser.parse_args()
+
+    for module in args.plugin:
+        importlib.import_module(module)
+    unknown = [name for name in args.strategies if name not in STRATEGIES]
+    if unknown:
+        parser.error(f"unknown strategies {unknown}; registered: {sorted(STRATEGIES)}")
+
+    run_batch(args.replications, args.steps, args.territories, args.out, seed=args.seed, workers=args.workers,
+              strategies=args.strategies, agents_per_strategy=args.agents_per_strategy, k=args.k,
+              plugins=tuple(args.plugin))
+    print(f"Wrote ownership time series to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
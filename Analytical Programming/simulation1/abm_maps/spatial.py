@@ -0,0 +1,89 @@
+import numpy as np
+from geopy.distance import geodesic
+from scipy.spatial import cKDTree
+
+# --- Constants ---
+# Haversine is within ~0.5% of the WGS-84 geodesic, so anything further than
+# this factor from the spherical minimum can never be the geodesic minimum.
+GEODESIC_TOLERANCE = 1.01
+INITIAL_K = 16
+
+
+def to_unit_xyz(lats, lons):
+    """Lat/lon in degrees to points on the unit sphere (chord order == great-circle order)."""
+    lat, lon = np.radians(lats), np.radians(lons)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+class SpatialIndex:
+    """Answers "nearest unclaimed territory" over lat/lon held as NumPy arrays.
+
+    Candidates come from a KD-tree over the still-unclaimed points (rebuilt once
+    half of them have been claimed); only those inside GEODESIC_TOLERANCE of the
+    best spherical distance are re-ranked with geopy's geodesic, so the greedy
+    agent makes the same choices as a full geodesic scan.
+    """
+
+    def __init__(self, lats, lons):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.xyz = to_unit_xyz(self.lats, self.lons)
+        self.unclaimed = np.ones(len(self.lats), dtype=bool)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.tree_idx = np.flatnonzero(self.unclaimed)
+        self.tree = cKDTree(self.xyz[self.tree_idx]) if self.tree_idx.size else None
+        self.tree_claimed = 0
+
+    def claim(self, idx):
+        if not self.unclaimed[idx]:
+            return
+        self.unclaimed[idx] = False
+        self.tree_claimed += 1
+        if self.tree_claimed * 2 > self.tree_idx.size:
+            self._rebuild()
+
+    def nearest_unclaimed(self, idx):
+        """Index of the closest unclaimed territory to `idx`, or None if none are left."""
+        if self.tree is None:
+            return None
+
+        k = INITIAL_K
+        while True:
+            k = min(k, self.tree_idx.size)
+            dist, pos = self.tree.query(self.xyz[idx], k=k)
+            dist, found = np.atleast_1d(dist), self.tree_idx[np.atleast_1d(pos)]
+            keep = self.unclaimed[found] & (found != idx)
+            exhausted = k == self.tree_idx.size
+            if keep.any():
+                best = dist[keep][0]
+                # the tree may hold more candidates inside the tolerance band
+                if exhausted or dist[-1] > best * GEODESIC_TOLERANCE:
+                    break
+            elif exhausted:
+                return None
+            k *= 2
+
+        shortlist = found[keep & (dist <= best * GEODESIC_TOLERANCE)]
+        if shortlist.size == 1:
+            return int(shortlist[0])
+
+        # sort into index order so min() keeps the original tie-breaking
+        lat, lon = self.lats[idx], self.lons[idx]
+        return int(min(
+            np.sort(shortlist),
+            key=lambda i: geodesic((lat, lon), (self.lats[i], self.lons[i])).km
+        ))
+
+
+def knn_adjacency(lats, lons, k):
+    """k nearest neighbours of every territory (excluding itself), nearest first.
+
+    Built once at reset so each agent's candidate set is k territories instead
+    of the whole map.
+    """
+    xyz = to_unit_xyz(lats, lons)
+    k = min(k, len(xyz) - 1)
+    _, idx = cKDTree(xyz).query(xyz, k=k + 1)
+    return idx[:, 1:].astype(np.int32)
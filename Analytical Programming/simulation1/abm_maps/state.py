@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# --- Constants ---
+UNCLAIMED = -1
+UNCLAIMED_COLOR = [180, 180, 180]  # RGB
+
+
+class TerritoryState:
+    """Struct-of-arrays territory table.
+
+    `lat`/`lon` are float32, `owner` is an int8 agent code (UNCLAIMED = -1; int16
+    once there are more than 127 agents) and `owned_counts[code]` is the number of
+    territories each agent currently holds, so a step only touches the territories
+    it changes and memory is a few bytes per territory.
+    """
+
+    def __init__(self, lats, lons, num_agents):
+        self.lat = np.asarray(lats, dtype=np.float32)
+        self.lon = np.asarray(lons, dtype=np.float32)
+        owner_dtype = np.int8 if num_agents <= np.iinfo(np.int8).max else np.int16
+        self.owner = np.full(len(self.lat), UNCLAIMED, dtype=owner_dtype)
+        self.owned_counts = np.zeros(num_agents, dtype=np.int64)
+        self.dirty = None  # set of changed indices, only kept once track_changes() is called
+        self._names = None
+
+    def __len__(self):
+        return len(self.lat)
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = np.array([f"G{i+1}" for i in range(len(self))], dtype=object)
+        return self._names
+
+    def track_changes(self):
+        """Start recording which territories change owner (used by the map renderer)."""
+        self.dirty = set()
+
+    def drain_dirty(self):
+        """Return the indices changed since the last call and clear the dirty set."""
+        changed = np.fromiter(self.dirty, dtype=np.intp, count=len(self.dirty))
+        self.dirty.clear()
+        return changed
+
+    def set_owners(self, idxs, codes):
+        """Give territories `idxs` (unique) to agents `codes`; returns the previous owner codes."""
+        previous = self.owner[idxs].copy()
+        was_owned = previous != UNCLAIMED
+        self.owned_counts -= np.bincount(previous[was_owned], minlength=len(self.owned_counts))
+        self.owned_counts += np.bincount(codes, minlength=len(self.owned_counts))
+        self.owner[idxs] = codes
+        if self.dirty is not None:
+            self.dirty.update(idxs[previous != codes].tolist())
+        return previous
+
+    def layer_frame(self, agent_colors, agent_names):
+        """DataFrame for a pydeck ScatterplotLayer.
+
+        lat/lon are handed over without copying; colors are a single vectorized
+        palette gather and the owner label is a Categorical over the int8 codes.
+        """
+        palette = np.array([UNCLAIMED_COLOR] + list(agent_colors), dtype=np.uint8)
+        rgb = palette[self.owner.astype(np.intp) + 1]
+        return pd.DataFrame({
+            'lat': self.lat,
+            'lon': self.lon,
+            'r': rgb[:, 0],
+            'g': rgb[:, 1],
+            'b': rgb[:, 2],
+            'name': self.names,
+            'owner': pd.Categorical.from_codes(self.owner + 1, categories=["Unclaimed"] + list(agent_names)),
+        }, copy=False)
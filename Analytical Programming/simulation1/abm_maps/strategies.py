@@ -0,0 +1,51 @@
+import numpy as np
+
+from state import UNCLAIMED
+
+# --- Strategy Registry ---
+# A strategy is called once per active agent per step as
+#     strategy(sim, code, current_idx, neighbours) -> target index or None
+# `neighbours` is the agent's candidate set: an index array from the adjacency
+# built at reset, or None when every other territory is adjacent. Returning None
+# makes the simulation move the agent to a random candidate instead.
+STRATEGIES = {}
+
+
+def register_strategy(name):
+    """Decorator that makes a policy available by name to TerritorySimulation."""
+    def decorator(fn):
+        STRATEGIES[name] = fn
+        return fn
+    return decorator
+
+
+def select(sim, neighbours, current_idx, predicate):
+    """Random candidate whose owner code satisfies `predicate`, or None."""
+    owner = sim.territories.owner
+    if neighbours is None:
+        options = np.flatnonzero(predicate(owner))
+        options = options[options != current_idx]
+    else:
+        options = neighbours[predicate(owner[neighbours])]
+    return sim.choice(options) if len(options) else None
+
+
+# --- Built-in Strategies ---
+@register_strategy("greedy")
+def greedy(sim, code, current_idx, neighbours):
+    # The KD-tree lookup is already sublinear, so greedy stays exact
+    # (closest unclaimed anywhere) whatever the adjacency is.
+    return sim.spatial_index.nearest_unclaimed(current_idx)
+
+
+@register_strategy("random")
+def random_unclaimed(sim, code, current_idx, neighbours):
+    return select(sim, neighbours, current_idx, lambda owner: owner == UNCLAIMED)
+
+
+@register_strategy("aggressive")
+def aggressive(sim, code, current_idx, neighbours):
+    target_idx = select(sim, neighbours, current_idx, lambda owner: (owner != UNCLAIMED) & (owner != code))
+    if target_idx is None:
+        target_idx = select(sim, neighbours, current_idx, lambda owner: owner == UNCLAIMED)
+    return target_idx
@@ -1,10 +1,14 @@
 import streamlit as st
-import networkx as nx
 import matplotlib.pyplot as plt
 import numpy as np
-import pandas as pd
-import random
-import time
+import sys
+from pathlib import Path
+from engine import MisinformationEngine
+from live import LiveView, SimulationWorker
+from sweep import METRICS, PARAMETERS, parameter_grid, run_sweep, summarize
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # shared simulation1 modules
+from graph_cache import cached_graph
 
 # Streamlit UI setup
 st.title("Misinformation Dynamic Network Simulation")
@@ -14,38 +18,20 @@ st.sidebar.header("Simulation Parameters")
 N = st.sidebar.slider("Number of Agents", min_value=50, max_value=500, value=100, step=10)
 misinformation_spread_prob = st.sidebar.slider("Misinformation Spread Probability", min_value=0.0, max_value=1.0, value=0.3, step=0.05)
 fact_check_prob = st.sidebar.slider("Fact-Checking Probability", min_value=0.0, max_value=1.0, value=0.1, step=0.05)
-epsilon = st.sidebar.slider("Epsilon (E-Greedy Believers)", min_value=0.0, max_value=1.0, value=0.1, step=0.05)
+epsilon = st.sidebar.slider("Epsilon (E-Greedy Believers)", min_value=0.0, max_value=1.0, value=0.1, step=0.05,
+                            help="No effect on the vectorized engine: exploring picks a uniform neighbour, "
+                                 "which is how every target is already drawn.")
 steps = st.sidebar.slider("Simulation Steps", min_value=50, max_value=500, value=200, step=10)
+max_fps = st.sidebar.slider("Max Frames per Second", min_value=1, max_value=30, value=5)
+graph_seed = st.sidebar.number_input("Network Seed", min_value=0, value=42, step=1)
 
-# Create a Scale-Free Network
-G = nx.barabasi_albert_graph(N, 3)
-network_pos = nx.spring_layout(G)  # Fixed layout for consistent visualization
-
-# Assign belief states to nodes
-belief_states = ["Believer", "Skeptic", "Neutral", "Influencer"]
-node_colors = {}
-node_sizes = {}
-skep_strategies = {}  # Store UCB skeptics
-agent_types = {"Believer": set(), "Skeptic": set(), "Neutral": set(), "Influencer": set()}
-rewards = {"Skeptic": [0], "Believer": [0]}  # Track cumulative rewards over time
-
-for node in G.nodes():
-    belief = random.choices(belief_states, weights=[0.4, 0.3, 0.2, 0.1])[0]
-    if belief == "Skeptic":
-        skep_strategies[node] = "UCB"  # All skeptics use UCB
-    elif belief == "Believer":
-        skep_strategies[node] = "E-Greedy"  # All believers use E-Greedy
-    agent_types[belief].add(node)
-    node_colors[node] = {"Believer": "red", "Skeptic": "blue", "Neutral": "gray", "Influencer": "green"}[belief]
-    node_sizes[node] = {"Believer": 100, "Skeptic": 100, "Neutral": 80, "Influencer": 300}[belief]
+# Create a Scale-Free Network (cached per (N, m, seed), so moving the other
+# sliders does not regenerate the graph or recompute its layout)
+G, network_pos = cached_graph(N, 3, int(graph_seed))  # Fixed layout for consistent visualization
 
-# Initialize tracking metrics
-belief_counts = {"Believers": [len(agent_types["Believer"])],
-                 "Skeptics": [len(agent_types["Skeptic"])],
-                 "Neutrals": [len(agent_types["Neutral"])],
-                 "Influencers": [len(agent_types["Influencer"])],
-                 "Rewards_Skeptic": [0],
-                 "Rewards_Believer": [0]}
+# Assign belief states to nodes; the engine keeps them as int8 arrays over a CSR
+# copy of the graph (see engine.py) instead of Python sets and dicts
+engine = MisinformationEngine.from_networkx(G, misinformation_spread_prob, fact_check_prob, epsilon)
 
 # Streamlit visualization setup
 st.sidebar.write("Click the button below to start the simulation.")
@@ -54,68 +40,61 @@ if st.sidebar.button("Start Simulation"):
     status_text = st.empty()
     network_plot = st.empty()
     graph_plot = st.empty()
-    
-    for t in range(steps):
-        reward_skeptic = rewards["Skeptic"][-1]
-        reward_believer = rewards["Believer"][-1]
-        
-        for node in list(G.nodes()):
-            neighbors = list(G.neighbors(node))
-            if not neighbors:
-                continue
-            target = random.choice(neighbors)
-            
-            if node in agent_types["Believer"]:  # E-Greedy believers spreading misinformation
-                if random.random() < epsilon:
-                    target = random.choice(neighbors)  # Explore new target
-                if random.random() < misinformation_spread_prob and target in agent_types["Neutral"]:
-                    agent_types["Believer"].add(target)
-                    agent_types["Neutral"].remove(target)
-                    node_colors[target] = "red"
-                    reward_believer += 1
-                elif target in agent_types["Influencer"]:
-                    agent_types["Believer"].add(target)
-                    node_colors[target] = "red"
-                    reward_believer += 2
-            
-            elif node in agent_types["Skeptic"]:  # UCB skeptics counter misinformation
-                if node in skep_strategies and skep_strategies[node] == "UCB":
-                    if random.random() < fact_check_prob and target in agent_types["Believer"]:
-                        agent_types["Skeptic"].add(target)
-                        agent_types["Believer"].remove(target)
-                        node_colors[target] = "blue"
-                        reward_skeptic += 1
-                    elif target in agent_types["Influencer"] and node_colors[target] == "red":
-                        agent_types["Skeptic"].add(target)
-                        node_colors[target] = "blue"
-                        reward_skeptic += 2
-        
-        rewards["Believer"].append(reward_believer)
-        rewards["Skeptic"].append(reward_skeptic)
-        
-        belief_counts["Believers"].append(len(agent_types["Believer"]))
-        belief_counts["Skeptics"].append(len(agent_types["Skeptic"]))
-        belief_counts["Neutrals"].append(len(agent_types["Neutral"]))
-        belief_counts["Influencers"].append(len(agent_types["Influencer"]))
-        
-        progress_bar.progress((t + 1) / steps)
-        status_text.text(f"Simulation Step {t + 1}/{steps}")
-        
-        if t % 10 == 0:
-            fig, ax = plt.subplots(figsize=(12, 10))
-            nx.draw(G, pos=network_pos, node_color=[node_colors[n] for n in G.nodes()], node_size=[node_sizes[n] for n in G.nodes()], edge_color="lightgray", with_labels=False)
-            network_plot.pyplot(fig)
-            
-            fig, axs = plt.subplots(1, 2, figsize=(18, 6))
-            axs[0].plot(range(len(belief_counts["Believers"])), belief_counts["Believers"], label="Believers (E-Greedy)", color="red")
-            axs[0].plot(range(len(belief_counts["Skeptics"])), belief_counts["Skeptics"], label="Skeptics (UCB)", color="blue")
-            axs[0].set_title("Believers vs. Skeptics Over Time")
-            axs[0].legend()
-            
-            axs[1].plot(range(len(belief_counts["Neutrals"])), belief_counts["Neutrals"], label="Neutrals", color="gray")
-            axs[1].set_title("Neutral Count Over Time")
-            axs[1].legend()
-            
-            graph_plot.pyplot(fig)
-    
+
+    # The simulation runs on a worker thread; this loop only draws the newest
+    # snapshot, at most max_fps times a second, into figures built once.
+    worker = SimulationWorker(engine, steps)
+    view = LiveView(G, network_pos, engine.sizes, engine.color)
+    worker.start()
+    try:
+        for snapshot in worker.frames(max_fps):
+            t = snapshot["step"]
+            view.update(worker.counts[:t + 1], snapshot["colors"])
+            network_plot.pyplot(view.network_fig)
+            graph_plot.pyplot(view.series_fig)
+            progress_bar.progress(t / steps)
+            status_text.text(f"Simulation Step {t}/{steps}")
+    finally:
+        worker.stop_event.set()
+        view.close()
+
     st.success("Simulation Complete")
+
+# --- Parameter Sweep ---
+# Runs every combination of the selected values many times across all cores and
+# stores per-step counts in a Parquet file; the results section below only reads
+# that file, so changing what is displayed never reruns the simulations.
+st.sidebar.header("Parameter Sweep")
+grid_values = [round(float(x), 2) for x in np.arange(0.0, 1.0001, 0.05)]
+sweep_spread = st.sidebar.multiselect("Spread Probabilities", grid_values, default=[0.1, 0.3, 0.5])
+sweep_fact_check = st.sidebar.multiselect("Fact-Checking Probabilities", grid_values, default=[0.1])
+replications = st.sidebar.slider("Replications per Grid Point", min_value=2, max_value=200, value=20)
+sweep_path = st.sidebar.text_input("Sweep Results File", "sweep.parquet")
+
+if st.sidebar.button("Run Parameter Sweep"):
+    grid = parameter_grid(sweep_spread, sweep_fact_check)
+    sweep_bar = st.progress(0)
+    run_sweep(grid, replications, N, steps, sweep_path, graph_seed=int(graph_seed),
+              progress=lambda done, total: sweep_bar.progress(done / total))
+    st.success(f"Sweep Complete: {len(grid)} grid points x {replications} replications")
+
+@st.cache_data
+def load_summary(path, modified):
+    return summarize(path)  # `modified` only keys the cache to the file version
+
+if Path(sweep_path).exists():
+    st.header("Parameter Sweep Results")
+    summary = load_summary(sweep_path, Path(sweep_path).stat().st_mtime)
+    metric = st.selectbox("Metric", METRICS)
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    for point, frame in summary.groupby(level=PARAMETERS):
+        x = frame.index.get_level_values("step")
+        label = ", ".join(f"{name}={value:.2f}" for name, value in zip(PARAMETERS, point))
+        ax.plot(x, frame[("mean", metric)], label=label)
+        ax.fill_between(x, frame[("low", metric)], frame[("high", metric)], alpha=0.2)
+    ax.set_title(f"Mean {metric} with 95% Confidence Band")
+    ax.set_xlabel("Step")
+    ax.legend()
+    st.pyplot(fig)
+    plt.close(fig)
@@ -0,0 +1,121 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # shared simulation1 modules
+from graph_cache import csr_from_edges
+
+# --- Belief State Encoding ---
+# The original model keeps overlapping sets (a converted Influencer stays in the
+# Influencer set as well as Believer/Skeptic), so each node's membership is a
+# bitmask in one int8 vector.
+BELIEVER, SKEPTIC, NEUTRAL, INFLUENCER = 1, 2, 4, 8
+BELIEF_STATES = ["Believer", "Skeptic", "Neutral", "Influencer"]
+BELIEF_BITS = [BELIEVER, SKEPTIC, NEUTRAL, INFLUENCER]
+BELIEF_WEIGHTS = [0.4, 0.3, 0.2, 0.1]
+
+# Node colours as int8 codes (index into COLOR_NAMES)
+GRAY, RED, BLUE, GREEN = 0, 1, 2, 3
+COLOR_NAMES = np.array(["gray", "red", "blue", "green"])
+INITIAL_COLORS = np.array([RED, BLUE, GRAY, GREEN], dtype=np.int8)
+INITIAL_SIZES = np.array([100, 100, 80, 300], dtype=np.int16)
+# The original loop visits nodes in id order and later nodes see earlier
+# conversions; applying the rules to this many id-ordered chunks per step
+# keeps that ordering effect while each chunk is still one vectorized pass.
+SWEEPS = 16
+
+
+# --- Graph Construction ---
+def csr_from_networkx(G):
+    """CSR adjacency of a networkx graph whose nodes are 0..n-1."""
+    edges = np.array(G.edges(), dtype=np.int64).reshape(-1, 2)
+    return csr_from_edges(G.number_of_nodes(), edges[:, 0], edges[:, 1])
+
+
+# --- Vectorized Propagation Engine ---
+class MisinformationEngine:
+    """Believer/Skeptic propagation over a CSR graph, one NumPy pass per rule.
+
+    Every step each acting node picks one random neighbour; targets and
+    Bernoulli trials are drawn in bulk per chunk of node ids and the
+    transitions are applied with masked array updates. This reproduces the
+    per-node loop's belief counts and rewards in distribution, not draw for draw.
+    """
+
+    def __init__(self, indptr, indices, spread_prob, fact_check_prob, epsilon, seed=None, sweeps=SWEEPS):
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.n = len(self.indptr) - 1
+        self.degree = np.diff(self.indptr)
+        self.has_neighbours = self.degree > 0
+        bounds = np.linspace(0, self.n, min(sweeps, max(self.n, 1)) + 1).astype(np.int64)
+        self.chunks = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        self.spread_prob = spread_prob
+        self.fact_check_prob = fact_check_prob
+        # Re-drawing a uniform neighbour with probability epsilon leaves the
+        # target distribution unchanged, so epsilon is kept for reporting only.
+        self.epsilon = epsilon
+        self.rng = np.random.default_rng(seed)
+
+        self.initial = self.rng.choice(len(BELIEF_STATES), size=self.n, p=BELIEF_WEIGHTS).astype(np.int8)
+        self.state = np.array(BELIEF_BITS, dtype=np.int8)[self.initial]
+        self.color = INITIAL_COLORS[self.initial]
+        self.sizes = INITIAL_SIZES[self.initial]
+        # Only the original skeptics run the UCB fact-checking policy
+        self.ucb = self.initial == BELIEF_STATES.index("Skeptic")
+        self.rewards = {"Believer": 0, "Skeptic": 0}
+
+    @classmethod
+    def from_networkx(cls, G, *args, **kwargs):
+        return cls(*csr_from_networkx(G), *args, **kwargs)
+
+    def _random_neighbours(self, nodes):
+        offsets = (self.rng.random(len(nodes)) * self.degree[nodes]).astype(np.int64)
+        return self.indices[self.indptr[nodes] + offsets]
+
+    def step(self):
+        for lo, hi in self.chunks:
+            self._spread(lo, hi)
+            self._fact_check(lo, hi)
+
+    def _spread(self, lo, hi):
+        """Believers (E-Greedy) among nodes lo..hi-1 spread misinformation."""
+        state, color = self.state, self.color
+        actors = lo + np.flatnonzero(((state[lo:hi] & BELIEVER) != 0) & self.has_neighbours[lo:hi])
+        targets = self._random_neighbours(actors)
+        target_state = state[targets]
+        convert = (self.rng.random(len(actors)) < self.spread_prob) & ((target_state & NEUTRAL) != 0)
+        influence = ~convert & ((target_state & INFLUENCER) != 0)
+
+        converted = np.unique(targets[convert])
+        influenced = targets[influence]
+        state[converted] = (state[converted] & ~NEUTRAL) | BELIEVER
+        state[influenced] |= BELIEVER
+        color[converted] = RED
+        color[influenced] = RED
+        self.rewards["Believer"] += len(converted) + 2 * len(influenced)
+
+    def _fact_check(self, lo, hi):
+        """Skeptics (UCB) among nodes lo..hi-1 counter misinformation."""
+        state, color = self.state, self.color
+        actors = lo + np.flatnonzero(self.ucb[lo:hi] & ((state[lo:hi] & BELIEVER) == 0) & self.has_neighbours[lo:hi])
+        targets = self._random_neighbours(actors)
+        target_state = state[targets]
+        convert = (self.rng.random(len(actors)) < self.fact_check_prob) & ((target_state & BELIEVER) != 0)
+        influence = ~convert & ((target_state & INFLUENCER) != 0) & (color[targets] == RED)
+
+        converted = np.unique(targets[convert])
+        influenced = np.setdiff1d(targets[influence], converted)
+        state[influenced] |= SKEPTIC
+        state[converted] = (state[converted] & ~BELIEVER) | SKEPTIC
+        color[influenced] = BLUE
+        color[converted] = BLUE
+        self.rewards["Skeptic"] += len(converted) + 2 * len(influenced)
+
+    def counts(self):
+        """Set sizes in the original model's terms (a node can be in several sets)."""
+        return {name: int(np.count_nonzero(self.state & bit)) for name, bit in zip(BELIEF_STATES, BELIEF_BITS)}
+
+    def node_colors(self):
+        return COLOR_NAMES[self.color]
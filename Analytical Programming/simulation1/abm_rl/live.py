@@ -0,0 +1,95 @@
+import queue
+import threading
+import time
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+
+from engine import BELIEF_STATES, COLOR_NAMES
+
+
+# --- Background Simulation ---
+class SimulationWorker(threading.Thread):
+    """Steps the engine on a background thread and publishes snapshots.
+
+    Counts and rewards for every step go into preallocated arrays; the queue only
+    ever holds the newest colour snapshot, so a slow viewer skips frames instead
+    of slowing the simulation down or buffering them all in memory.
+    """
+
+    def __init__(self, engine, steps):
+        super().__init__(daemon=True)
+        self.engine = engine
+        self.steps = steps
+        self.counts = np.zeros((steps + 1, len(BELIEF_STATES)), dtype=np.int64)
+        self.rewards = np.zeros((steps + 1, 2), dtype=np.int64)
+        self.snapshots = queue.Queue(maxsize=1)
+        self.stop_event = threading.Event()
+        self._record(0)
+
+    def _record(self, t):
+        self.counts[t] = list(self.engine.counts().values())
+        self.rewards[t] = self.engine.rewards["Believer"], self.engine.rewards["Skeptic"]
+
+    def _publish(self, snapshot):
+        # Single producer: after dropping the stale snapshot the put cannot block
+        try:
+            self.snapshots.get_nowait()
+        except queue.Empty:
+            pass
+        self.snapshots.put_nowait(snapshot)
+
+    def run(self):
+        for t in range(1, self.steps + 1):
+            if self.stop_event.is_set():
+                break
+            self.engine.step()
+            self._record(t)
+            self._publish({"step": t, "colors": self.engine.color.copy()})
+
+    def frames(self, max_fps):
+        """Yield the newest snapshot at most `max_fps` times a second until the run ends."""
+        frame_budget = 1.0 / max_fps
+        while self.is_alive() or not self.snapshots.empty():
+            frame_start = time.perf_counter()
+            try:
+                yield self.snapshots.get(timeout=frame_budget)
+            except queue.Empty:
+                continue
+            time.sleep(max(0.0, frame_budget - (time.perf_counter() - frame_start)))
+
+
+# --- Reusable Figures ---
+class LiveView:
+    """Network and time-series figures built once and updated in place."""
+
+    def __init__(self, G, pos, sizes, colors):
+        self.network_fig, ax = plt.subplots(figsize=(12, 10))
+        nx.draw_networkx_edges(G, pos=pos, ax=ax, edge_color="lightgray")
+        self.nodes = nx.draw_networkx_nodes(G, pos=pos, ax=ax, node_color=COLOR_NAMES[colors], node_size=sizes)
+        ax.set_axis_off()
+
+        self.series_fig, self.axs = plt.subplots(1, 2, figsize=(18, 6))
+        self.believers, = self.axs[0].plot([], [], label="Believers (E-Greedy)", color="red")
+        self.skeptics, = self.axs[0].plot([], [], label="Skeptics (UCB)", color="blue")
+        self.axs[0].set_title("Believers vs. Skeptics Over Time")
+        self.axs[0].legend()
+
+        self.neutrals, = self.axs[1].plot([], [], label="Neutrals", color="gray")
+        self.axs[1].set_title("Neutral Count Over Time")
+        self.axs[1].legend()
+
+    def update(self, counts, colors):
+        self.nodes.set_facecolor(COLOR_NAMES[colors])
+        x = np.arange(len(counts))
+        self.believers.set_data(x, counts[:, BELIEF_STATES.index("Believer")])
+        self.skeptics.set_data(x, counts[:, BELIEF_STATES.index("Skeptic")])
+        self.neutrals.set_data(x, counts[:, BELIEF_STATES.index("Neutral")])
+        for ax in self.axs:
+            ax.relim()
+            ax.autoscale_view()
+
+    def close(self):
+        plt.close(self.network_fig)
+        plt.close(self.series_fig)
@@ -0,0 +1,117 @@
+import argparse
+import itertools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from engine import BELIEF_STATES, MisinformationEngine
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # shared simulation1 modules
+from graph_cache import csr_from_edges, load_arrays
+
+# --- Constants ---
+# epsilon is not swept: the engine's targets do not depend on it (see MisinformationEngine),
+# so epsilon cells would only repeat each other
+PARAMETERS = ["spread_prob", "fact_check_prob"]
+METRICS = ["believers", "skeptics", "neutrals", "influencers", "reward_believer", "reward_skeptic"]
+
+
+def run_replication(params, replication, seed, num_agents, m, graph_seed, steps):
+    """One realization on the shared (num_agents, m, graph_seed) network, as a per-step frame."""
+    edges, _ = load_arrays(num_agents, m, graph_seed)
+    indptr, indices = csr_from_edges(num_agents, edges[:, 0], edges[:, 1])
+    engine = MisinformationEngine(indptr, indices, params["spread_prob"], params["fact_check_prob"],
+                                  epsilon=0.0, seed=seed)
+
+    history = np.zeros((steps + 1, len(METRICS)), dtype=np.int64)
+    for t in range(steps + 1):
+        if t > 0:
+            engine.step()
+        counts = engine.counts()
+        history[t] = [counts[name] for name in BELIEF_STATES] + [engine.rewards["Believer"], engine.rewards["Skeptic"]]
+
+    frame = pd.DataFrame(history, columns=METRICS)
+    frame.insert(0, "step", np.arange(steps + 1, dtype=np.int32))
+    frame.insert(0, "replication", np.int32(replication))
+    for name in reversed(PARAMETERS):
+        frame.insert(0, name, np.float32(params[name]))
+    return frame
+
+
+def parameter_grid(spread_probs, fact_check_probs):
+    return [
+        dict(zip(PARAMETERS, values))
+        for values in itertools.product(spread_probs, fact_check_probs)
+    ]
+
+
+def run_sweep(grid, replications, num_agents, steps, out_path, seed=None, workers=None,
+              m=3, graph_seed=42, progress=None):
+    """Run every grid point `replications` times across a process pool.
+
+    Each run gets its own child of `SeedSequence(seed)`, so results do not depend
+    on worker count or completion order. Runs are appended to one Parquet file
+    as they finish, so memory stays bounded however large the sweep is.
+    `progress(done, total)` is called after each run.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    load_arrays(num_agents, m, graph_seed)  # build the shared network once, before the workers need it
+    tasks = [(params, r) for params in grid for r in range(replications)]
+    seeds = np.random.SeedSequence(seed).spawn(len(tasks))
+
+    writer = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(run_replication, params, r, seeds[i], num_agents, m, graph_seed, steps)
+                for i, (params, r) in enumerate(tasks)
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                table = pa.Table.from_pandas(future.result(), preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out_path, table.schema)
+                writer.write_table(table)
+                if progress is not None:
+                    progress(done, len(tasks))
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def summarize(path):
+    """Mean, standard deviation and 95% confidence band per grid point and step."""
+    runs = pd.read_parquet(path)
+    grouped = runs.groupby(PARAMETERS + ["step"])[METRICS]
+    mean, std, n = grouped.mean(), grouped.std().fillna(0.0), grouped.count()
+    half_width = 1.96 * std / np.sqrt(n)
+    return pd.concat({"mean": mean, "low": mean - half_width, "high": mean + half_width}, axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo parameter sweep of the misinformation model.")
+    parser.add_argument("--spread", type=float, nargs="+", default=[0.3])
+    parser.add_argument("--fact-check", type=float, nargs="+", default=[0.1])
+    parser.add_argument("--replications", type=int, default=30)
+    parser.add_argument("--agents", type=int, default=100)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--graph-seed", type=int, default=42)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--out", default="sweep.parquet")
+    args = parser.parse_args()
+
+    grid = parameter_grid(args.spread, args.fact_check)
+    run_sweep(grid, args.replications, args.agents, args.steps, args.out, seed=args.seed, workers=args.workers,
+              graph_seed=args.graph_seed,
+              progress=lambda done, total: print(f"\r{done}/{total} runs", end="", flush=True))
+    print(f"\nWrote {len(grid)} grid points x {args.replications} replications to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+import functools
+import os
+import threading
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+from scipy.ndimage import map_coordinates
+from scipy.signal import fftconvolve
+
+# --- Constants ---
+CACHE_DIR = Path(os.environ.get("BASE_GRAPH_CACHE", Path.home() / ".cache" / "base-graphs"))
+MEMORY_SLOTS = 16  # graphs kept in the in-memory LRU tier
+SPRING_LAYOUT_MAX_NODES = 1000  # above this, fast_layout replaces nx.spring_layout
+
+
+def fast_layout(n, edges, seed=None, iterations=50, grid=128):
+    """Force-directed layout in O(n + edges + grid² log grid) per iteration.
+
+    Fruchterman–Reingold forces as in nx.spring_layout, but the all-pairs
+    repulsion is approximated particle-mesh style: node density is binned onto a
+    grid, convolved with the k²·r/|r|² repulsion kernel by FFT and interpolated
+    back at each node. Attraction along edges stays exact.
+    """
+    rng = np.random.default_rng(seed)
+    pos = rng.random((n, 2))
+    k = 1.0 / np.sqrt(n)
+    src, dst = edges[:, 0], edges[:, 1]
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+
+    offsets = np.arange(-grid + 1, grid)
+    off_x, off_y = np.meshgrid(offsets, offsets, indexing='ij')
+    r2 = (off_x ** 2 + off_y ** 2).astype(float)
+    r2[grid - 1, grid - 1] = np.inf  # no self-repulsion
+
+    for _ in range(iterations):
+        lo = pos.min(axis=0)
+        cell = max((pos.max(axis=0) - lo).max(), 1e-9) / (grid - 1)
+        coords = (pos - lo) / cell
+        cells = np.rint(coords).astype(np.int64)
+        density = np.bincount(cells[:, 0] * grid + cells[:, 1], minlength=grid * grid).reshape(grid, grid)
+
+        disp = np.empty((n, 2))
+        for axis, offset in enumerate((off_x, off_y)):
+            field = fftconvolve(density.astype(float), k * k * offset / (r2 * cell), mode='same')
+            disp[:, axis] = map_coordinates(field, coords.T, order=1)
+
+        delta = pos[src] - pos[dst]
+        attraction = delta * (np.sqrt((delta ** 2).sum(axis=1)) / k)[:, None]
+        for axis in range(2):
+            disp[:, axis] -= np.bincount(src, attraction[:, axis], minlength=n)
+            disp[:, axis] += np.bincount(dst, attraction[:, axis], minlength=n)
+
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-12)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    return nx.rescale_layout(pos)
+
+
+# --- CSR Adjacency ---
+def csr_from_edges(n, src, dst):
+    """Symmetric CSR (indptr, indices) adjacency from an undirected edge list."""
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    order = np.argsort(rows, kind="stable")
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order].astype(np.int32)
+
+
+def barabasi_albert_csr(n, m, seed=None):
+    """Barabási–Albert graph straight to CSR, without building a networkx graph.
+
+    Same process as nx.barabasi_albert_graph (star on m + 1 nodes, then each new
+    node attaches to m distinct nodes drawn proportionally to degree), but the
+    degree-weighted pool is a preallocated NumPy array so 10^6 nodes fit easily.
+    """
+    rng = np.random.default_rng(seed)
+    num_edges = m + (n - m - 1) * m
+    src = np.empty(num_edges, dtype=np.int32)
+    dst = np.empty(num_edges, dtype=np.int32)
+    pool = np.empty(2 * num_edges, dtype=np.int32)
+
+    src[:m], dst[:m] = 0, np.arange(1, m + 1)
+    pool[:m], pool[m:2 * m] = 0, np.arange(1, m + 1)
+    e, size = m, 2 * m
+
+    draws = rng.random(4 * m * n)
+    d = 0
+    for source in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            if d == len(draws):
+                draws, d = rng.random(4 * m * n), 0
+            targets.add(int(pool[int(draws[d] * size)]))
+            d += 1
+        for target in targets:
+            src[e], dst[e] = source, target
+            pool[size], pool[size + 1] = source, target
+            e += 1
+            size += 2
+    return csr_from_edges(n, src, dst)
+
+
+def _generate(n, m, seed):
+    G = nx.barabasi_albert_graph(n, m, seed=seed)
+    edges = np.array(G.edges(), dtype=np.int32).reshape(-1, 2)
+    if n <= SPRING_LAYOUT_MAX_NODES:
+        layout = nx.spring_layout(G, seed=seed)
+        pos = np.array([layout[node] for node in range(n)])
+    else:
+        pos = fast_layout(n, edges, seed=seed)
+    return edges, pos.astype(np.float32)
+
+
+def load_arrays(n, m, seed):
+    """Edge list and node positions for BA(n, m, seed), from the .npz tier or freshly built."""
+    path = CACHE_DIR / f"ba_n{n}_m{m}_seed{seed}.npz"
+    if path.exists():
+        with np.load(path) as data:
+            return data["edges"], data["pos"]
+
+    edges, pos = _generate(n, m, seed)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    # One tmp file per process and thread: Streamlit sessions are threads of one process, and
+    # lru_cache does not stop two of them building the same graph at once
+    tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, edges=edges, pos=pos)
+    os.replace(tmp_path, path)  # atomic, so readers see the old file or the new one, never a partial one
+    return edges, pos
+
+
+@functools.lru_cache(maxsize=MEMORY_SLOTS)
+def cached_graph(n, m, seed):
+    """Barabási–Albert graph and its fixed layout, keyed by (n, m, seed).
+
+    Served from an in-memory LRU first, then from CACHE_DIR on disk, and only
+    generated when neither has it. The graph is frozen because every caller
+    shares the same instance.
+    """
+    edges, pos = load_arrays(n, m, seed)
+    G = nx.Graph()
+    G.add_nodes_from(range(n))
+    G.add_edges_from(edges.tolist())
+    return nx.freeze(G), {node: pos[node] for node in range(n)}
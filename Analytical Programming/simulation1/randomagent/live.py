@@ -0,0 +1,97 @@
+import time
+
+import matplotlib.pyplot as plt
+import networkx as nx
+import numpy as np
+
+# (series name, colour, title, y label) for the three time-series panels
+SERIES = [
+    ("infections", "red", "Infection Spread Over Time", "New Infections per Step"),
+    ("alive", "green", "New Alive Per Step", "Alive Count Per Step"),
+    ("dead", "blue", "New Dead Per Step", "Dead Count Per Step"),
+]
+
+
+# --- Incremental Smoothing ---
+class RollingMean:
+    """Trailing moving average kept up to date in O(1) work per new value.
+
+    Values and their means go into arrays preallocated for the whole run. The
+    first window - 1 means average over the values seen so far, where
+    np.convolve(mode='valid') would drop those points.
+    """
+
+    def __init__(self, window, capacity):
+        self.window = window
+        self.values = np.zeros(capacity, dtype=np.int64)
+        self.means = np.zeros(capacity)
+        self.count = 0
+        self.total = 0
+
+    def push(self, value):
+        i = self.count
+        self.values[i] = value
+        self.total += value
+        if i >= self.window:
+            self.total -= self.values[i - self.window]
+        self.means[i] = self.total / min(i + 1, self.window)
+        self.count += 1
+
+
+# --- Frame Rate Cap ---
+class FrameThrottle:
+    """Decides which steps get drawn: every `every`-th step, at most `max_fps` per second.
+
+    The budget is counted from the end of the previous frame, so however slow a
+    frame is to render the simulation always gets the gap between frames.
+    """
+
+    def __init__(self, max_fps, every=1):
+        self.frame_budget = 1.0 / max_fps
+        self.every = every
+        self.next_frame = -np.inf
+
+    def due(self, step, final=False):
+        return final or (step % self.every == 0 and time.perf_counter() >= self.next_frame)
+
+    def drawn(self):
+        self.next_frame = time.perf_counter() + self.frame_budget
+
+
+# --- Reusable Figure ---
+class LiveView:
+    """The 2×2 network and time-series figure, built once and updated in place."""
+
+    def __init__(self, G, positions, node_sizes, node_colors, steps, window=1):
+        self.fig, axes = plt.subplots(2, 2, figsize=(12, 10))
+        nx.draw_networkx_edges(G, pos=positions, ax=axes[0, 0], edge_color="gray")
+        self.nodes = nx.draw_networkx_nodes(G, pos=positions, ax=axes[0, 0], node_color=node_colors,
+                                            node_size=node_sizes)
+        axes[0, 0].set_title("Disease Spread Network")
+        axes[0, 0].set_axis_off()
+
+        self.series = {}
+        self.x = np.arange(1, steps + 1)
+        for ax, (name, color, title, ylabel) in zip([axes[0, 1], axes[1, 0], axes[1, 1]], SERIES):
+            line, = ax.plot([], [], color=color, linewidth=1.5)
+            ax.set_xlim(0, steps)
+            ax.set_title(title)
+            ax.set_xlabel("Time (Seconds)")
+            ax.set_ylabel(ylabel)
+            self.series[name] = (ax, line, RollingMean(window, steps))
+        self.fig.tight_layout()
+
+    def record(self, **counts):
+        """Add one step's new counts (infections=, alive=, dead=) to the rolling averages."""
+        for name, value in counts.items():
+            self.series[name][2].push(value)
+
+    def update(self, node_colors):
+        self.nodes.set_facecolor(node_colors)
+        for ax, line, smoothed in self.series.values():
+            line.set_data(self.x[:smoothed.count], smoothed.means[:smoothed.count])
+            ax.relim()
+            ax.autoscale_view(scalex=False)
+
+    def close(self):
+        plt.close(self.fig)
@@ -0,0 +1,278 @@
+import argparse
+import heapq
+import sys
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # shared simulation1 modules
+from graph_cache import barabasi_albert_csr, cached_graph
+
+# --- Status Encoding ---
+# Statuses are int8 codes (index into STATUSES / STATUS_COLORS)
+SUSCEPTIBLE, INFECTED, ALIVE, DEAD = 0, 1, 2, 3
+STATUSES = ["susceptible", "infected", "alive", "dead"]
+STATUS_COLORS = np.array(["gray", "red", "green", "blue"])
+SIZES = [1, 2, 3, 4]  # 1 (most susceptible) to 4 (least susceptible)
+RECOVERY_STEPS = 3  # steps an agent stays infected before recovering
+CHECK_ALPHA = 0.01  # scheduler check fails when any metric's KS p-value is below CHECK_ALPHA / number of metrics
+
+
+# --- Struct-of-Arrays Model ---
+class DiseaseSpreadModel:
+    """Disease spread over a CSR adjacency with one NumPy array per agent attribute.
+
+    Follows the per-agent rules of the original Agent class: every infected
+    agent tries each susceptible neighbour with probability p / neighbour.size
+    and a success (re)starts that neighbour's infection timer at the infector's
+    size; timers count down once per step. History is kept as change events
+    (step, node, new status) only, so memory grows with the number of status
+    changes rather than N × steps.
+    """
+
+    def __init__(self, indptr, indices, infection_probability, initial_infected, seed=None):
+        self.indptr = np.asarray(indptr)
+        self.indices = np.asarray(indices)
+        self.num_agents = n = len(self.indptr) - 1
+        self.degree = np.diff(self.indptr)
+        self.infection_probability = infection_probability
+        self.rng = np.random.default_rng(seed)
+
+        self.size = self.rng.choice(np.array(SIZES, dtype=np.int8), size=n)
+        self.status = np.full(n, SUSCEPTIBLE, dtype=np.int8)
+        self.status[self.rng.choice(n, size=initial_infected, replace=False)] = INFECTED
+        self.infection_timer = np.zeros(n, dtype=np.int8)
+        self.recovery_timer = np.zeros(n, dtype=np.int8)
+
+        self.initial_status = self.status.copy()
+        self.event_steps, self.event_nodes, self.event_status = [], [], []
+        self.infection_counts = []
+        self.alive_counts = []
+        self.dead_counts = []
+        self.step_count = 0
+
+    @classmethod
+    def from_params(cls, **params):
+        """Model on the shared cached (N, 3, graph_seed) graph, keeping G and its layout for drawing."""
+        G, positions = cached_graph(params["N"], 3, params["graph_seed"])
+        A = nx.to_scipy_sparse_array(G, nodelist=range(params["N"]), format="csr")
+        model = cls(A.indptr, A.indices, params["infection_probability"], params["initial_infected"],
+                    seed=params.get("seed"))
+        model.G, model.node_positions = G, positions
+        return model
+
+    def _neighbour_pairs(self, nodes):
+        """(source, neighbour) for every CSR entry in the rows of `nodes`, in node order."""
+        counts = self.degree[nodes]
+        src = np.repeat(nodes, counts)
+        starts = np.repeat(self.indptr[nodes] - np.cumsum(counts) + counts, counts)
+        return src, self.indices[starts + np.arange(len(src))]
+
+    def _interact(self):
+        src, dst = self._neighbour_pairs(np.flatnonzero(self.status == INFECTED))
+        exposed = self.status[dst] == SUSCEPTIBLE
+        src, dst = src[exposed], dst[exposed]
+        hit = self.rng.random(len(dst)) < self.infection_probability / self.size[dst]
+        src, dst = src[hit], dst[hit]
+        # The per-agent loop lets the last infector in node order set the timer
+        dst, last = np.unique(dst[::-1], return_index=True)
+        self.infection_timer[dst] = self.size[src[::-1][last]]
+
+    def step(self):
+        self._interact()
+        status = self.status
+
+        incubating = (status == SUSCEPTIBLE) & (self.infection_timer > 0)
+        recovering = (status == INFECTED) & (self.recovery_timer > 0)
+        self.infection_timer[incubating] -= 1
+        self.recovery_timer[recovering] -= 1
+
+        infected = np.flatnonzero(incubating & (self.infection_timer == 0))
+        recovered = np.flatnonzero(recovering & (self.recovery_timer == 0))
+        status[infected] = INFECTED
+        self.recovery_timer[infected] = RECOVERY_STEPS
+        outcome = np.where(self.rng.random(len(recovered)) > 0.5, ALIVE, DEAD).astype(np.int8)
+        status[recovered] = outcome
+
+        self.step_count += 1
+        self._record(np.concatenate([infected, recovered]),
+                     np.concatenate([np.full(len(infected), INFECTED, dtype=np.int8), outcome]))
+        self.infection_counts.append(len(infected))
+        self.alive_counts.append(int(np.count_nonzero(outcome == ALIVE)))
+        self.dead_counts.append(int(np.count_nonzero(outcome == DEAD)))
+
+    def _record(self, nodes, new_status):
+        if len(nodes):
+            self.event_steps.append(np.full(len(nodes), self.step_count, dtype=np.int32))
+            self.event_nodes.append(nodes.astype(np.int32))
+            self.event_status.append(new_status)
+
+    def events(self):
+        """All status changes so far as (step, node, status) arrays."""
+        if not self.event_steps:
+            return np.empty(0, np.int32), np.empty(0, np.int32), np.empty(0, np.int8)
+        return np.concatenate(self.event_steps), np.concatenate(self.event_nodes), np.concatenate(self.event_status)
+
+    def status_at(self, step):
+        """Status of every agent after `step` steps, replayed from the change events."""
+        steps, nodes, new_status = self.events()
+        status = self.initial_status.copy()
+        upto = steps <= step
+        status[nodes[upto]] = new_status[upto]
+        return status
+
+    def history_matrix(self):
+        """Dense int8 (steps + 1) × N status matrix; only sensible for small N."""
+        steps, nodes, new_status = self.events()
+        history = np.empty((self.step_count + 1, self.num_agents), dtype=np.int8)
+        history[0] = status = self.initial_status.copy()
+        bounds = np.searchsorted(steps, np.arange(1, self.step_count + 2))  # events are in step order
+        for t in range(1, self.step_count + 1):
+            changed = slice(bounds[t - 1], bounds[t])
+            status[nodes[changed]] = new_status[changed]
+            history[t] = status
+        return history
+
+    def counts(self):
+        return dict(zip(STATUSES, np.bincount(self.status, minlength=len(STATUSES)).tolist()))
+
+    def node_colors(self):
+        return STATUS_COLORS[self.status]
+
+    def node_sizes(self, scale=50):
+        return self.size.astype(np.int32) * scale  # int8 sizes would overflow when scaled
+
+
+# --- Event-Driven Model ---
+class EventDiseaseSpreadModel(DiseaseSpreadModel):
+    """Same rules as DiseaseSpreadModel, scheduled as discrete events.
+
+    A hit at step t with infector size s makes the target infectious at step
+    t + s - 1 unless a later hit reschedules it, and an infection at step t
+    resolves to alive/dead at step t + RECOVERY_STEPS. Those transitions are
+    batched per due step in a heap of step numbers, and only the frontier
+    (infected agents that still have a susceptible neighbour) makes infection
+    attempts. A step costs O(frontier edges + due events) rather than O(N).
+    Exposed edges are visited in the same order as in the tick model, so with
+    the same seed both produce identical runs.
+    """
+
+    def __init__(self, indptr, indices, infection_probability, initial_infected, seed=None):
+        super().__init__(indptr, indices, infection_probability, initial_infected, seed=seed)
+        self.infection_due = np.full(self.num_agents, -1, dtype=np.int32)  # latest scheduled step per agent
+        self.frontier = np.flatnonzero(self.status == INFECTED)
+        self.due_steps = []  # heap of steps with pending events
+        self.pending = {}  # step -> {"infect": [node arrays], "recover": [node arrays]}
+
+    def _schedule(self, kind, steps, nodes):
+        for step in np.unique(steps).tolist():
+            if step not in self.pending:
+                self.pending[step] = {"infect": [], "recover": []}
+                heapq.heappush(self.due_steps, step)
+            self.pending[step][kind].append(nodes[steps == step])
+
+    def _interact(self):
+        t = self.step_count + 1
+        src, dst = self._neighbour_pairs(self.frontier)
+        exposed = self.status[dst] == SUSCEPTIBLE
+        src, dst = src[exposed], dst[exposed]
+        # Agents with no susceptible neighbour left can never infect anyone again
+        self.frontier = np.unique(src)
+        hit = self.rng.random(len(dst)) < self.infection_probability / self.size[dst]
+        src, dst = src[hit], dst[hit]
+        dst, last = np.unique(dst[::-1], return_index=True)
+        due = self.size[src[::-1][last]].astype(np.int32) + (t - 1)
+        self.infection_due[dst] = due
+        self._schedule("infect", due, dst)
+
+    def _due_events(self, t):
+        if not self.due_steps or self.due_steps[0] != t:
+            return np.empty(0, np.int64), np.empty(0, np.int64)
+        heapq.heappop(self.due_steps)
+        batch = self.pending.pop(t)
+        infect = np.concatenate(batch["infect"]) if batch["infect"] else np.empty(0, np.int64)
+        recover = np.concatenate(batch["recover"]) if batch["recover"] else np.empty(0, np.int64)
+        # Rescheduled infections leave stale entries behind; only the latest counts
+        infect = np.unique(infect[(self.infection_due[infect] == t) & (self.status[infect] == SUSCEPTIBLE)])
+        return infect, recover
+
+    def step(self):
+        self._interact()
+        t = self.step_count + 1
+        infected, recovered = self._due_events(t)
+
+        self.status[infected] = INFECTED
+        self._schedule("recover", np.full(len(infected), t + RECOVERY_STEPS), infected)
+        outcome = np.where(self.rng.random(len(recovered)) > 0.5, ALIVE, DEAD).astype(np.int8)
+        self.status[recovered] = outcome
+        self.frontier = np.union1d(np.setdiff1d(self.frontier, recovered, assume_unique=True), infected)
+
+        self.step_count = t
+        self._record(np.concatenate([infected, recovered]),
+                     np.concatenate([np.full(len(infected), INFECTED, dtype=np.int8), outcome]))
+        self.infection_counts.append(len(infected))
+        self.alive_counts.append(int(np.count_nonzero(outcome == ALIVE)))
+        self.dead_counts.append(int(np.count_nonzero(outcome == DEAD)))
+
+
+SCHEDULERS = {"Tick": DiseaseSpreadModel, "Event-driven": EventDiseaseSpreadModel}
+
+
+# --- Scheduler Check ---
+def compare_schedulers(indptr, indices, infection_probability, initial_infected, steps, replications, seed=None):
+    """Final status counts and total infections of both schedulers over independent replications.
+
+    Returns {scheduler: (replications, len(STATUSES) + 1) array}. Every run
+    gets its own seed, so this compares the two outcome distributions rather
+    than paired runs (with a shared seed the runs coincide exactly).
+    """
+    seeds = np.random.SeedSequence(seed).spawn(2 * replications)
+    results = {}
+    for j, (name, cls) in enumerate(SCHEDULERS.items()):
+        rows = []
+        for r in range(replications):
+            model = cls(indptr, indices, infection_probability, initial_infected, seed=seeds[j * replications + r])
+            for _ in range(steps):
+                model.step()
+            rows.append(list(model.counts().values()) + [sum(model.infection_counts)])
+        results[name] = np.array(rows)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that the tick and event-driven schedulers agree in distribution.")
+    parser.add_argument("--agents", type=int, default=300)
+    parser.add_argument("--initial-infected", type=int, default=3)
+    parser.add_argument("--infection-probability", type=float, default=0.3)
+    parser.add_argument("--steps", type=int, default=30)
+    parser.add_argument("--replications", type=int, default=200)
+    parser.add_argument("--graph-seed", type=int, default=42)
+    parser.add_argument("--seed", type=int, default=0, help="fixed by default so the check is repeatable")
+    parser.add_argument("--alpha", type=float, default=CHECK_ALPHA,
+                        help="family-wise significance level, Bonferroni-split over the metrics")
+    args = parser.parse_args()
+
+    from scipy.stats import ks_2samp
+
+    indptr, indices = barabasi_albert_csr(args.agents, 3, seed=args.graph_seed)
+    results = compare_schedulers(indptr, indices, args.infection_probability, args.initial_infected,
+                                 args.steps, args.replications, seed=args.seed)
+    tick, event = results["Tick"], results["Event-driven"]
+    metrics = STATUSES + ["infections"]
+    threshold = args.alpha / len(metrics)
+    failed = []
+    print(f"{'metric':<12}{'tick mean':>12}{'event mean':>12}{'KS p-value':>12}")
+    for i, name in enumerate(metrics):
+        p_value = ks_2samp(tick[:, i], event[:, i]).pvalue
+        print(f"{name:<12}{tick[:, i].mean():>12.2f}{event[:, i].mean():>12.2f}{p_value:>12.3f}")
+        if p_value < threshold:
+            failed.append(name)
+    if failed:
+        print(f"FAIL: schedulers differ in {', '.join(failed)} (p < {threshold:.4f})")
+        sys.exit(1)
+    print(f"OK: no metric differs (every p >= {threshold:.4f})")
+
+
+if __name__ == "__main__":
+    main()